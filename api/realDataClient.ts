@@ -1,4 +1,4 @@
-import { supabase, ApyHistory, RebalanceEvent } from '../supabase';
+import { supabase, ApyHistory, RebalanceEvent, PriceRollup, RollupBucket, VaultRollup } from '../supabase';
 import { DashboardData } from '../types';
 
 const COINGECKO_API_URL = 'https://api.coingecko.com/api/v3';
@@ -61,6 +61,52 @@ export const fetchApyHistory = async (limit = 30): Promise<ApyHistory[]> => {
     }
 };
 
+/**
+ * Fetches precomputed price OHLC buckets (maintained by the keeper) in chronological order
+ */
+export const fetchPriceRollups = async (bucket: RollupBucket = 'day', limit = 90): Promise<PriceRollup[]> => {
+    if (!supabase) return [];
+
+    try {
+        const { data, error } = await supabase
+            .from('price_rollups')
+            .select('*')
+            .eq('symbol', 'ETH')
+            .eq('bucket', bucket)
+            .order('bucket_start', { ascending: false })
+            .limit(limit);
+
+        if (error) throw error;
+        return (data || []).reverse();
+    } catch (error) {
+        console.error('Error fetching price rollups:', error);
+        return [];
+    }
+};
+
+/**
+ * Fetches precomputed per-vault APY/TVL/gas buckets in chronological order
+ */
+export const fetchVaultRollups = async (bucket: RollupBucket = 'day', limit = 30): Promise<VaultRollup[]> => {
+    if (!supabase) return [];
+
+    try {
+        const { data, error } = await supabase
+            .from('vault_rollups')
+            .select('*')
+            .eq('vault_address', VAULT_ADDRESS)
+            .eq('bucket', bucket)
+            .order('bucket_start', { ascending: false })
+            .limit(limit);
+
+        if (error) throw error;
+        return (data || []).reverse();
+    } catch (error) {
+        console.error('Error fetching vault rollups:', error);
+        return [];
+    }
+};
+
 /**
  * Fetches recent rebalance events from Supabase
  */
@@ -136,27 +182,42 @@ const generateChartDataFromPrices = (prices: number[]) => {
 export const fetchDashboardData = async (): Promise<DashboardData> => {
     try {
         // Fetch data in parallel
-        const [apyHistory, rebalanceEvents, historicalPrices, currentPrice] = await Promise.all([
-            fetchApyHistory(30),
+        const [vaultRollups, priceRollups, rebalanceEvents, currentPrice] = await Promise.all([
+            fetchVaultRollups('day', 2),
+            fetchPriceRollups('day', 90),
             fetchRebalanceEvents(10),
-            fetchHistoricalPrices(),
             fetchCurrentEthPrice()
         ]);
 
+        // Daily rollups keep these reads constant-size; fall back to raw
+        // rows / CoinGecko until the keeper has produced any
+        const apyHistory: ApyHistory[] = vaultRollups.length > 0
+            ? []
+            : await fetchApyHistory(30);
+        const historicalPrices = priceRollups.length > 0
+            ? priceRollups.map((r) => r.close)
+            : await fetchHistoricalPrices();
+
+        const tvlSeries = vaultRollups.length > 0
+            ? vaultRollups.map((r) => r.tvl_last ?? 0)
+            : apyHistory.map((r) => r.tvl);
+
         // Get latest APY or calculate a default
-        const latestApy = apyHistory.length > 0
-            ? apyHistory[apyHistory.length - 1].apy
-            : 18.25;
+        const latestApy = vaultRollups.length > 0
+            ? vaultRollups[vaultRollups.length - 1].apy_avg ?? 18.25
+            : apyHistory.length > 0
+                ? apyHistory[apyHistory.length - 1].apy
+                : 18.25;
 
-        // Get latest TVL from APY history or use default
-        const latestTvl = apyHistory.length > 0
-            ? apyHistory[apyHistory.length - 1].tvl
+        // Get latest TVL or use default
+        const latestTvl = tvlSeries.length > 0
+            ? tvlSeries[tvlSeries.length - 1]
             : 0;
 
         // Calculate 24h change (compare with yesterday's data)
-        const tvlChange24h = apyHistory.length >= 2
-            ? ((apyHistory[apyHistory.length - 1].tvl - apyHistory[apyHistory.length - 2].tvl) /
-                apyHistory[apyHistory.length - 2].tvl) * 100
+        const tvlChange24h = tvlSeries.length >= 2 && tvlSeries[tvlSeries.length - 2] > 0
+            ? ((tvlSeries[tvlSeries.length - 1] - tvlSeries[tvlSeries.length - 2]) /
+                tvlSeries[tvlSeries.length - 2]) * 100
             : 2.4;
 
         // Get latest rebalance info
@@ -0,0 +1,92 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "forge-std/Script.sol";
+import "../src/CoreVault.sol";
+import "../src/ZkVerifier.sol";
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+
+/// @notice Mintable asset for local replay deployments
+contract ReplayToken is ERC20 {
+    constructor() ERC20("Replay USD", "rUSD") {}
+
+    function mint(address to, uint256 amount) external {
+        _mint(to, amount);
+    }
+}
+
+/// @notice Adapter that custodies assets so rebalance() runs its full withdraw/deploy path
+contract ReplayAdapter is IStrategyAdapter {
+    using SafeERC20 for IERC20;
+
+    IERC20 public immutable asset;
+    uint256 public deployedAssets;
+    int24 public tickLower;
+    int24 public tickUpper;
+
+    constructor(address _asset) {
+        asset = IERC20(_asset);
+    }
+
+    function deploy(uint256 assets, bytes calldata data) external returns (uint256) {
+        (tickLower, tickUpper) = abi.decode(data, (int24, int24));
+        asset.safeTransferFrom(msg.sender, address(this), assets);
+        deployedAssets += assets;
+        return assets;
+    }
+
+    function withdraw(uint256) external returns (uint256) {
+        uint256 amount = deployedAssets;
+        deployedAssets = 0;
+        if (amount > 0) {
+            asset.safeTransfer(msg.sender, amount);
+        }
+        return amount;
+    }
+
+    function harvest() external pure returns (uint256) {
+        return 0;
+    }
+
+    function estimatedTotalAssets() external view returns (uint256) {
+        return deployedAssets;
+    }
+}
+
+/// @notice Deploys REPLAY_VAULTS funded vaults for the keeper replay harness (scripts/replay.py)
+contract DeployReplayScript is Script {
+    function run() public {
+        uint256 deployerPrivateKey = vm.envUint("PRIVATE_KEY");
+        address keeper = vm.envAddress("KEEPER_ADDRESS");
+        uint256 vaultCount = vm.envOr("REPLAY_VAULTS", uint256(1));
+        uint256 depositPerVault = vm.envOr("REPLAY_DEPOSIT", uint256(1_000_000e18));
+        address deployer = vm.addr(deployerPrivateKey);
+
+        vm.startBroadcast(deployerPrivateKey);
+
+        ReplayToken asset = new ReplayToken();
+        console.log("ReplayToken Deployed at:", address(asset));
+
+        for (uint256 i = 0; i < vaultCount; i++) {
+            ReplayAdapter adapter = new ReplayAdapter(address(asset));
+            ZkVerifier verifier = new ZkVerifier(keeper);
+            CoreVault vault = new CoreVault(
+                IERC20(address(asset)),
+                "Replay Vault",
+                "rvUSD",
+                address(adapter),
+                address(verifier)
+            );
+            vault.grantRole(vault.KEEPER_ROLE(), keeper);
+
+            asset.mint(deployer, depositPerVault);
+            asset.approve(address(vault), depositPerVault);
+            vault.deposit(depositPerVault, deployer);
+
+            console.log("CoreVault Deployed at:", address(vault));
+        }
+
+        vm.stopBroadcast();
+    }
+}
@@ -0,0 +1,47 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "forge-std/Test.sol";
+import "../src/ZkVerifier.sol";
+
+/// @notice Checks signatures from scripts/keepers/signature_prover.py against ZkVerifier
+contract ZkVerifierTest is Test {
+    ZkVerifier verifier;
+
+    // Anvil account #0 (KEEPER_PK in tests/test_signature_prover.py)
+    uint256 keeperPk = 0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80;
+    address keeper;
+
+    // RebalanceSigner(KEEPER_PK).sign(-1000, 1000, 12345)
+    bytes constant PYTHON_PROOF =
+        hex"5cba3d57d2bccb0d55ab2e1e4b3356ba355a66cbf1371e8d271f7ebf6ec0636d6b790fff0aab32ae638e038fc3d4d5b46dec2d290fe85b9a0d10bd55b4c2a6d01b";
+
+    function setUp() public {
+        keeper = vm.addr(keeperPk);
+        verifier = new ZkVerifier(keeper);
+    }
+
+    /// @notice Python signer output is byte-identical to vm.sign over the same digest
+    function testPythonProofMatchesVmSign() public {
+        vm.roll(12345);
+        bytes32 messageHash = keccak256(abi.encodePacked(int24(-1000), int24(1000), block.number));
+        bytes32 ethSignedHash = keccak256(
+            abi.encodePacked("\x19Ethereum Signed Message:\n32", messageHash)
+        );
+
+        (uint8 v, bytes32 r, bytes32 s) = vm.sign(keeperPk, ethSignedHash);
+        assertEq(abi.encodePacked(r, s, v), PYTHON_PROOF, "Python proof must match vm.sign");
+    }
+
+    /// @notice Python signer output verifies on-chain at the signed block
+    function testPythonProofVerifies() public {
+        vm.roll(12345);
+        assertTrue(verifier.verify(PYTHON_PROOF, -1000, 1000), "Proof should verify");
+    }
+
+    /// @notice Proof is bound to the block number it was signed for
+    function testPythonProofRejectedAtOtherBlock() public {
+        vm.roll(12346);
+        assertFalse(verifier.verify(PYTHON_PROOF, -1000, 1000), "Proof should not verify");
+    }
+}
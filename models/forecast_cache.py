@@ -0,0 +1,168 @@
+# models/forecast_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Disk eviction frees space down to this fraction of max_disk_bytes, so a full
+# cache does not evict on every subsequent write
+DISK_LOW_WATER = 0.9
+
+
+def forecast_key(window, config: dict) -> str:
+    """
+    Content address of a forecast: hash of the input window plus model config.
+
+    Args:
+        window: Sequence of input prices (hashed as float64).
+        config (dict): JSON-serialisable model configuration.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(window, dtype=np.float64).tobytes())
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """
+    Two-tier memoisation for model forecasts.
+
+    An in-memory LRU holds the hottest entries. An optional on-disk tier keeps
+    JSON results across restarts and evicts least recently used files once it
+    exceeds max_disk_bytes. Recency and file sizes are tracked in memory (the
+    directory is scanned once, at start-up), so eviction never lists the
+    directory again.
+
+    Args:
+        max_entries (int): In-memory LRU capacity.
+        cache_dir (str): Directory for the disk tier (None disables it).
+        max_disk_bytes (int): Size bound for the disk tier.
+    """
+
+    def __init__(self, max_entries=1024, cache_dir=None, max_disk_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> file size, least recently used first
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            for _, name, size in sorted(self._disk_entries()):
+                self._disk_index[name[:-len(".json")]] = size
+            self._disk_bytes = sum(self._disk_index.values())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        return entries
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+            if self.cache_dir:
+                path = self._path(key)
+                try:
+                    with open(path) as f:
+                        value = json.load(f)
+                    os.utime(path)  # Refresh recency for LRU eviction
+                except (OSError, ValueError):
+                    value = None
+                if value is not None:
+                    if key in self._disk_index:
+                        self._disk_index.move_to_end(key)
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, value)
+                    return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        """Stores a JSON-serialisable value under key in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+            if not self.cache_dir:
+                return
+
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            payload = json.dumps(value)
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(payload) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(payload)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        target = self.max_disk_bytes * DISK_LOW_WATER
+        while self._disk_index and self._disk_bytes > target:
+            key, size = self._disk_index.popitem(last=False)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._disk_bytes -= size
+
+    def get_or_compute(self, window, config: dict, compute):
+        """
+        Returns the cached forecast for (window, config), computing it on a miss.
+
+        Args:
+            window: Input prices used by the estimator.
+            config (dict): Estimator name and parameters.
+            compute (callable): Zero-argument function producing the value.
+        """
+        key = forecast_key(window, config)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+
+_default_cache = ForecastCache()
+
+
+def get_default_cache() -> ForecastCache:
+    """Returns the process-wide cache used when no explicit cache is passed."""
+    return _default_cache
+
+
+def configure_default_cache(max_entries=1024, cache_dir=None, max_disk_bytes=64 * 1024 * 1024) -> ForecastCache:
+    """Replaces the process-wide cache, e.g. to enable the disk tier."""
+    global _default_cache
+    _default_cache = ForecastCache(max_entries, cache_dir, max_disk_bytes)
+    return _default_cache
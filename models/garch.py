@@ -0,0 +1,180 @@
+# models/garch.py
+import warnings
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+# Backcast of the initial variance: exponentially weighted mean of the first
+# squared residuals (same convention as arch)
+BACKCAST_WINDOW = 75
+BACKCAST_DECAY = 0.94
+
+# Hard cap on optimizer iterations so a pathological window cannot stall a cycle
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+# Starting-value grid (arch's GARCH grid without the asymmetry term)
+START_ALPHAS = (0.01, 0.05, 0.1, 0.2)
+START_PERSISTENCE = (0.5, 0.7, 0.9, 0.98)
+
+LOG_2PI = np.log(2 * np.pi)
+
+def backcast(resid: np.ndarray) -> float:
+    """Initial variance sigma2[-1] estimated from the leading residuals."""
+    tau = min(BACKCAST_WINDOW, resid.shape[0])
+    weights = BACKCAST_DECAY ** np.arange(tau)
+    return float(np.sum(resid[:tau] ** 2 * weights) / weights.sum())
+
+def conditional_variance(params, returns: np.ndarray, initial_variance: float) -> np.ndarray:
+    """
+    GARCH(1,1) conditional variances, computed as a single IIR filter.
+
+    sigma2[t] = omega + alpha * resid[t-1]^2 + beta * sigma2[t-1], with the
+    backcast standing in for both lagged terms at t = 0.
+    """
+    mu, omega, alpha, beta = params
+    resid = returns - mu
+    drive = np.empty_like(resid)
+    drive[0] = omega + (alpha + beta) * initial_variance
+    drive[1:] = omega + alpha * resid[:-1] ** 2
+    return lfilter([1.0], [1.0, -beta], drive)
+
+def negative_loglikelihood(params, returns: np.ndarray, initial_variance: float, gradient: bool = False):
+    """
+    Gaussian negative log-likelihood of GARCH(1,1) with a constant mean.
+
+    Args:
+        params: (mu, omega, alpha, beta).
+        returns (np.ndarray): Percentage returns.
+        initial_variance (float): Backcast variance.
+        gradient (bool): Also return the analytic gradient.
+
+    Returns:
+        float, or (float, np.ndarray) when gradient is True.
+    """
+    mu, omega, alpha, beta = params
+    resid = returns - mu
+    sigma2 = conditional_variance(params, returns, initial_variance)
+    if not np.all(sigma2 > 0):
+        return (np.inf, np.zeros(4)) if gradient else np.inf
+
+    nll = 0.5 * (resid.shape[0] * LOG_2PI + np.sum(np.log(sigma2)) + np.sum(resid ** 2 / sigma2))
+    if not gradient:
+        return nll
+
+    # d sigma2 / d theta obeys the same recursion as sigma2, so all four
+    # derivative series come out of one filter call
+    n = resid.shape[0]
+    drives = np.zeros((4, n))
+    drives[0, 1:] = -2.0 * alpha * resid[:-1]
+    drives[1] = 1.0
+    drives[2, 0] = initial_variance
+    drives[2, 1:] = resid[:-1] ** 2
+    drives[3, 0] = initial_variance
+    drives[3, 1:] = sigma2[:-1]
+    dsigma2 = lfilter([1.0], [1.0, -beta], drives, axis=1)
+
+    weight = 0.5 * (1.0 / sigma2 - resid ** 2 / sigma2 ** 2)
+    grad = dsigma2 @ weight
+    grad[0] -= np.sum(resid / sigma2)
+    return nll, grad
+
+def _starting_values(returns, initial_variance):
+    mu = float(np.mean(returns))
+    target = float(np.mean((returns - mu) ** 2))
+    best, best_nll = None, np.inf
+    for alpha in START_ALPHAS:
+        for persistence in START_PERSISTENCE:
+            candidate = np.array([mu, (1.0 - persistence) * target, alpha, persistence - alpha])
+            nll = negative_loglikelihood(candidate, returns, initial_variance)
+            if nll < best_nll:
+                best, best_nll = candidate, nll
+    return best
+
+def fit_garch11(returns, max_iterations: int = MAX_ITERATIONS, tol: float = TOLERANCE) -> dict:
+    """
+    Fits a constant-mean GARCH(1,1) with Gaussian errors by bounded SLSQP.
+
+    Args:
+        returns: Percentage returns.
+        max_iterations (int): Optimizer iteration cap.
+        tol (float): Optimizer tolerance.
+
+    Returns:
+        dict: mu, omega, alpha, beta, persistence, nll, converged, iterations,
+            message, flags (per-check sanity results), sane (all checks
+            passed), resid, sigma2 and next_variance (one-step forecast).
+    """
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    if returns.ndim != 1 or returns.shape[0] < 2:
+        raise ValueError("GARCH fit needs a 1-D series of at least 2 returns")
+
+    # Fit on standardised returns so mu and omega are O(1) whatever the price
+    # scale; alpha and beta are scale-free and the rest map back exactly
+    center = float(returns.mean())
+    scale = float(returns.std())
+    if not scale > 0:
+        raise ValueError("GARCH fit needs returns with non-zero variance")
+    standardised = (returns - center) / scale
+
+    initial_variance = backcast(standardised - standardised.mean())
+    bounds = [(None, None), (1e-8, 10.0), (0.0, 1.0), (0.0, 1.0)]
+    stationarity = {
+        "type": "ineq",
+        "fun": lambda p: 1.0 - p[2] - p[3],
+        "jac": lambda p: np.array([0.0, 0.0, -1.0, -1.0])
+    }
+
+    with warnings.catch_warnings():
+        # SLSQP line searches can step just past a bound; it clips and warns
+        warnings.filterwarnings("ignore", "Values in x were outside bounds", RuntimeWarning)
+        result = minimize(
+            negative_loglikelihood,
+            _starting_values(standardised, initial_variance),
+            args=(standardised, initial_variance, True),
+            jac=True,
+            method="SLSQP",
+            bounds=bounds,
+            constraints=[stationarity],
+            tol=tol,
+            options={"maxiter": max_iterations}
+        )
+
+    params = np.array([
+        center + scale * result.x[0],
+        scale ** 2 * result.x[1],
+        result.x[2],
+        result.x[3]
+    ])
+    nll = float(result.fun) + returns.shape[0] * np.log(scale)
+    mu, omega, alpha, beta = (float(v) for v in params)
+    resid = returns - mu
+    sigma2 = conditional_variance(params, returns, scale ** 2 * initial_variance)
+    next_variance = omega + alpha * resid[-1] ** 2 + beta * sigma2[-1]
+    persistence = alpha + beta
+
+    flags = {
+        "finite": bool(np.all(np.isfinite(params)) and np.isfinite(nll)),
+        "positive_variance": bool(omega > 0 and np.all(sigma2 > 0) and next_variance > 0),
+        "non_negative": alpha >= 0 and beta >= 0,
+        "stationary": persistence <= 1.0 + 1e-8,
+        # Loose guard against a forecast wildly out of line with the sample
+        "plausible_forecast": bool(1e-6 <= next_variance / scale ** 2 <= 100.0),
+    }
+
+    return {
+        "mu": mu,
+        "omega": omega,
+        "alpha": alpha,
+        "beta": beta,
+        "persistence": persistence,
+        "nll": nll,
+        "converged": result.status == 0,
+        "iterations": int(result.nit),
+        "message": str(result.message),
+        "flags": flags,
+        "sane": all(flags.values()),
+        "resid": resid,
+        "sigma2": sigma2,
+        "next_variance": float(next_variance)
+    }
@@ -0,0 +1,171 @@
+# models/range_optimizer.py
+import time
+import numpy as np
+from models.vamer_model import fit_garch
+from models.range_simulator import simulate_paths
+
+LOG_TICK = np.log(1.0001)
+
+def _position_terms(a_sqrt, b_sqrt):
+    """Liquidity and initial holdings of a position worth 1 at price ratio 1."""
+    liquidity = 1.0 / (2.0 - a_sqrt - 1.0 / b_sqrt)
+    risky = liquidity * (1.0 - 1.0 / b_sqrt)
+    quote = liquidity * (1.0 - a_sqrt)
+    return liquidity, risky, quote
+
+def expected_impermanent_loss(lower_log, upper_log, terminal_log) -> np.ndarray:
+    """
+    Expected loss of a concentrated position versus holding its initial tokens.
+
+    Args:
+        lower_log, upper_log: Range bounds as log(price / current), broadcastable.
+        terminal_log (np.ndarray): Simulated terminal log returns (n_paths,).
+
+    Returns:
+        np.ndarray: Expected IL as a fraction of the initial position value.
+    """
+    a_sqrt = np.exp(0.5 * np.asarray(lower_log))[..., None]
+    b_sqrt = np.exp(0.5 * np.asarray(upper_log))[..., None]
+    liquidity, risky, quote = _position_terms(a_sqrt, b_sqrt)
+
+    p_sqrt = np.clip(np.exp(0.5 * terminal_log), a_sqrt, b_sqrt)
+    price = np.exp(terminal_log)
+    # Token balances at the clipped price, valued at the actual price
+    lp_value = liquidity * ((1.0 / p_sqrt - 1.0 / b_sqrt) * price + (p_sqrt - a_sqrt))
+    hold_value = risky * price + quote
+    return (hold_value - lp_value).mean(axis=-1)
+
+def _first_exits(paths, lower_log, upper_log):
+    """
+    First step at which each path breaches each lower / upper grid bound
+    (horizon = never). Running extremes are monotone, so a breach count per
+    step turns into a first-breach step per bound.
+    """
+    grid = np.arange(len(lower_log))
+    lower_breached = np.searchsorted(-lower_log, -np.minimum.accumulate(paths, axis=1), side="left")
+    upper_breached = np.searchsorted(upper_log, np.maximum.accumulate(paths, axis=1), side="left")
+    lower_exit = (lower_breached[:, :, None] <= grid).sum(axis=1)
+    upper_exit = (upper_breached[:, :, None] <= grid).sum(axis=1)
+    return lower_exit, upper_exit
+
+def optimize_range(price_history: list, hedge_ratio: float = 0.5, spacing: int = 60,
+                   horizon: int = 24, fee_rate: float = 0.00005, gas_fraction: float = 0.0,
+                   trend_strength: float = 0.1, n_paths: int = 4000, max_steps: int = 40,
+                   time_budget: float = None, seed=None) -> dict:
+    """
+    Searches (tick_lower, tick_upper) pairs on the tick-spacing grid for the best
+    expected fee capture minus impermanent loss and amortised rebalance gas.
+
+    Ranges may be asymmetric: the forecast distribution is tilted by the trend
+    model (hedge_ratio 1.0 = downtrend, 0.0 = uptrend) and every lower/upper
+    combination on the grid is scored. Each simulated path is followed until
+    it first leaves the range; the IL at that price is what a rebalance locks
+    in, and the keeper is assumed to re-centre a similar range one step later.
+
+    The trend tilt drives occupancy (fees, exits, rebalances). IL is scored on
+    the same paths with the tilt removed: against a drifting price, "IL" versus
+    the range's own initial token mix also contains the directional P&L of
+    that mix, which the hedge leg carries, and would otherwise pull the range
+    against the trend.
+
+    Args:
+        price_history (list): List of historical closing prices.
+        hedge_ratio (float): Output of get_hedge_ratio.
+        spacing (int): Pool tick spacing.
+        horizon (int): Steps the range is planned for.
+        fee_rate (float): Fee yield per step of a full-range position.
+        gas_fraction (float): Rebalance gas cost as a fraction of position value.
+        trend_strength (float): Per-step drift, in forecast sigmas, applied by the trend signal.
+        n_paths (int): Monte Carlo paths for the forecast distribution.
+        max_steps (int): Grid points per side of the current tick.
+        time_budget (float): Seconds allowed; the best range found so far is
+            returned when it runs out (None = evaluate the full grid).
+        seed: Seed for reproducible replays.
+
+    Returns:
+        dict: tick_lower, tick_upper, score, expected_fees, expected_il,
+            gas_penalty, stay_probability, in_range_fraction,
+            expected_rebalances, candidates_evaluated, candidates_total,
+            timed_out, elapsed.
+    """
+    started = time.perf_counter()
+    deadline = None if time_budget is None else started + time_budget
+
+    params = fit_garch(price_history)
+    sigma_pct = np.sqrt(params["next_variance"])
+    drift = (1.0 - 2.0 * hedge_ratio) * trend_strength * sigma_pct
+    paths = simulate_paths(params, n_paths=n_paths, horizon=horizon, seed=seed, drift=drift)
+
+    # Grid around the current tick, aligned to spacing and wide enough to
+    # cover roughly four horizon sigmas on each side
+    current_tick = np.log(price_history[-1]) / LOG_TICK
+    base = int(np.floor(current_tick / spacing)) * spacing
+    reach = 4.0 * sigma_pct / 100 * np.sqrt(horizon) / LOG_TICK
+    step_ticks = max(1, int(np.ceil(reach / max_steps / spacing))) * spacing
+    lower_ticks = base - step_ticks * np.arange(max_steps)
+    upper_ticks = base + step_ticks * np.arange(1, max_steps + 1)
+    lower_log = (lower_ticks - current_tick) * LOG_TICK
+    upper_log = (upper_ticks - current_tick) * LOG_TICK
+
+    lower_exit, upper_exit = _first_exits(paths, lower_log, upper_log)
+    # Drift adds drift/100 per step to every path; removing it leaves the
+    # same shocks under a driftless forecast
+    neutral_paths = paths - drift / 100 * np.arange(1, horizon + 1)
+    neutral_lower_exit, neutral_upper_exit = _first_exits(neutral_paths, lower_log, upper_log)
+    grid = np.arange(max_steps)
+
+    # Capital efficiency versus a full-range position
+    a_sqrt = np.exp(0.5 * lower_log)[:, None]
+    b_sqrt = np.exp(0.5 * upper_log)[None, :]
+    efficiency = 2.0 * _position_terms(a_sqrt, b_sqrt)[0]
+
+    shape = (max_steps, max_steps)
+    stay_probability = np.full(shape, np.nan)
+    steps_in_range = np.full(shape, np.nan)
+    loss_per_range = np.full(shape, np.nan)
+
+    # Rows nearest the 2-sigma band are evaluated first so a timeout still
+    # leaves a sensible answer
+    band_row = int(np.argmin(np.abs(lower_log + 2.0 * sigma_pct / 100)))
+    row_order = np.argsort(np.abs(grid - band_row), kind="stable")
+    rows = np.arange(n_paths)[:, None]
+    timed_out = False
+    for row in row_order:
+        if deadline is not None and time.perf_counter() > deadline and not np.isnan(steps_in_range).all():
+            timed_out = True
+            break
+        exit_step = np.minimum(lower_exit[:, row, None], upper_exit)
+        stay_probability[row] = (exit_step == horizon).mean(axis=0)
+        steps_in_range[row] = exit_step.mean(axis=0)
+        neutral_exit = np.minimum(neutral_lower_exit[:, row, None], neutral_upper_exit)
+        exit_log = neutral_paths[rows, np.minimum(neutral_exit, horizon - 1)]
+        loss_per_range[row] = expected_impermanent_loss(lower_log[row], upper_log, exit_log.T)
+
+    # Renewal approximation: each exit costs one keeper step out of range,
+    # one rebalance and another range's worth of IL
+    exit_probability = 1.0 - stay_probability
+    rebalances = exit_probability * horizon / np.maximum(steps_in_range, 1.0)
+    in_range_fraction = steps_in_range / np.maximum(steps_in_range + exit_probability, 1e-12)
+    expected_fees = fee_rate * horizon * efficiency * in_range_fraction
+    expected_il = loss_per_range * (1.0 + rebalances - exit_probability)
+    gas_penalty = gas_fraction * rebalances
+
+    score = expected_fees - expected_il - gas_penalty
+    score = np.where(np.isnan(score), -np.inf, score)
+    i, j = np.unravel_index(np.argmax(score), shape)
+
+    return {
+        "tick_lower": int(lower_ticks[i]),
+        "tick_upper": int(upper_ticks[j]),
+        "score": float(score[i, j]),
+        "expected_fees": float(expected_fees[i, j]),
+        "expected_il": float(expected_il[i, j]),
+        "gas_penalty": float(gas_penalty[i, j]),
+        "stay_probability": float(stay_probability[i, j]),
+        "in_range_fraction": float(in_range_fraction[i, j]),
+        "expected_rebalances": float(rebalances[i, j]),
+        "candidates_evaluated": int(np.isfinite(score).sum()),
+        "candidates_total": int(score.size),
+        "timed_out": timed_out,
+        "elapsed": time.perf_counter() - started
+    }
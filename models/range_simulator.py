@@ -0,0 +1,164 @@
+# models/range_simulator.py
+import numpy as np
+from models.vamer_model import band_ticks, fit_garch
+
+LOG_TICK = np.log(1.0001)
+
+DEFAULT_MULTIPLIERS = (1.0, 1.5, 2.0, 2.5, 3.0, 4.0)
+
+def simulate_paths(params: dict, n_paths: int = 10000, horizon: int = 24, seed=None,
+                   innovations: str = "bootstrap", drift: float = 0.0) -> np.ndarray:
+    """
+    Simulates forward GARCH(1,1) log-price paths in one NumPy batch.
+
+    The recursion runs over the horizon; every step updates all paths at once.
+
+    Args:
+        params (dict): Output of fit_garch (percent-return units).
+        n_paths (int): Number of simulated paths.
+        horizon (int): Steps ahead, in the sampling interval of the price history.
+        seed: Seed or np.random.Generator for reproducibility.
+        innovations (str): "bootstrap" resamples the fitted standardised
+            residuals (keeps fat tails), "normal" draws Gaussian shocks.
+        drift (float): Extra per-step drift in percent, e.g. a trend tilt.
+
+    Returns:
+        np.ndarray: (n_paths, horizon) cumulative log returns from the current price.
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+    std_resid = np.asarray(params.get("std_resid", ()), dtype=np.float64)
+    if innovations == "bootstrap" and std_resid.size > 1:
+        # Re-standardise so the bootstrap keeps the fitted variance scale
+        std_resid = (std_resid - std_resid.mean()) / std_resid.std()
+        shocks = rng.choice(std_resid, size=(horizon, n_paths))
+    else:
+        shocks = rng.standard_normal((horizon, n_paths))
+
+    mu, omega = params["mu"], params["omega"]
+    alpha, beta = params["alpha"], params["beta"]
+
+    returns = np.empty((horizon, n_paths))
+    variance = np.full(n_paths, params["next_variance"])
+    for t in range(horizon):
+        eps = np.sqrt(variance) * shocks[t]
+        returns[t] = mu + drift + eps
+        variance = omega + alpha * eps * eps + beta * variance
+
+    return np.cumsum(returns, axis=0).T / 100 # Convert back from percentage
+
+def range_hit_stats(paths: np.ndarray, lower_log, upper_log) -> dict:
+    """
+    Scores candidate ranges against simulated paths.
+
+    Args:
+        paths (np.ndarray): (n_paths, horizon) cumulative log returns.
+        lower_log: Candidate lower bounds as log(price_lower / current_price).
+        upper_log: Candidate upper bounds as log(price_upper / current_price).
+
+    Returns:
+        dict: Arrays (one entry per candidate) of stay_probability (never
+            leaves the range), time_in_range (expected fraction of steps in
+            range) and terminal_probability (in range at the horizon).
+    """
+    lower_log = np.atleast_1d(np.asarray(lower_log, dtype=np.float64))
+    upper_log = np.atleast_1d(np.asarray(upper_log, dtype=np.float64))
+
+    path_min = paths.min(axis=1)
+    path_max = paths.max(axis=1)
+    stays = (path_min[None, :] >= lower_log[:, None]) & (path_max[None, :] <= upper_log[:, None])
+
+    # Fraction of time in range = mean of the step-wise CDF difference, computed
+    # from sorted per-step values so the cost does not scale with the candidate count
+    sorted_steps = np.sort(paths, axis=0)
+    n_paths = paths.shape[0]
+    below_upper = np.stack([np.searchsorted(col, upper_log, side="right") for col in sorted_steps.T])
+    below_lower = np.stack([np.searchsorted(col, lower_log, side="left") for col in sorted_steps.T])
+    time_in_range = (below_upper - below_lower).mean(axis=0) / n_paths
+
+    terminal = paths[:, -1]
+    terminal_in = (terminal[None, :] >= lower_log[:, None]) & (terminal[None, :] <= upper_log[:, None])
+
+    return {
+        "stay_probability": stays.mean(axis=1),
+        "time_in_range": time_in_range,
+        "terminal_probability": terminal_in.mean(axis=1)
+    }
+
+def band_log_bounds(current_price: float, sigma: float, multipliers, spacing: int = 60) -> tuple:
+    """
+    Log bounds, relative to the current price, of the spacing-aligned ticks
+    predict_next_range deploys for each multiplier.
+
+    Returns:
+        tuple: (lower_log, upper_log, ticks) with one entry per multiplier;
+            a band whose lower edge is at or below zero gets lower_log -inf
+            and ticks None.
+    """
+    lower_log, upper_log, ticks = [], [], []
+    for m in multipliers:
+        if 1 - m * sigma <= 0:
+            lower_log.append(-np.inf)
+            upper_log.append(np.log1p(m * sigma))
+            ticks.append(None)
+            continue
+        tick_lower, tick_upper = band_ticks(current_price, sigma, m, spacing)
+        lower_log.append(tick_lower * LOG_TICK)
+        upper_log.append(tick_upper * LOG_TICK)
+        ticks.append((tick_lower, tick_upper))
+    log_price = np.log(current_price)
+    return np.array(lower_log) - log_price, np.array(upper_log) - log_price, ticks
+
+def evaluate_band_widths(price_history: list, multipliers=DEFAULT_MULTIPLIERS, horizon: int = 24,
+                         n_paths: int = 10000, seed=None, params: dict = None, spacing: int = 60) -> list:
+    """
+    Estimates range-hit statistics for candidate sigma-band widths.
+
+    Args:
+        price_history (list): List of historical closing prices.
+        multipliers: Candidate sigma multipliers for the symmetric band.
+        horizon (int): Steps until the next expected rebalance.
+        n_paths (int): Number of simulated paths.
+        seed: Seed for reproducibility.
+        params (dict): Pre-fitted GARCH parameters (fitted if omitted).
+        spacing (int): Pool tick spacing; bands are scored at the aligned
+            ticks predict_next_range would deploy, not the raw sigma band.
+
+    Returns:
+        list: One dict per multiplier with sigma_multiplier, tick_lower,
+            tick_upper, stay_probability, time_in_range and terminal_probability.
+    """
+    params = params if params is not None else fit_garch(price_history)
+    sigma = np.sqrt(params["next_variance"]) / 100
+    lower_log, upper_log, ticks = band_log_bounds(price_history[-1], sigma, multipliers, spacing)
+
+    paths = simulate_paths(params, n_paths=n_paths, horizon=horizon, seed=seed)
+    stats = range_hit_stats(paths, lower_log, upper_log)
+
+    return [
+        {
+            "sigma_multiplier": float(m),
+            "tick_lower": ticks[i][0] if ticks[i] else None,
+            "tick_upper": ticks[i][1] if ticks[i] else None,
+            "stay_probability": float(stats["stay_probability"][i]),
+            "time_in_range": float(stats["time_in_range"][i]),
+            "terminal_probability": float(stats["terminal_probability"][i])
+        }
+        for i, m in enumerate(multipliers)
+    ]
+
+def choose_sigma_multiplier(price_history: list, target_probability: float = 0.8,
+                            multipliers=DEFAULT_MULTIPLIERS, horizon: int = 24,
+                            n_paths: int = 10000, seed=None, spacing: int = 60) -> float:
+    """
+    Picks the narrowest band whose simulated stay-in-range probability over
+    the horizon meets the target (narrower bands earn more fees per unit).
+
+    Returns:
+        float: Chosen sigma multiplier (the widest candidate if none qualify).
+    """
+    results = evaluate_band_widths(price_history, sorted(multipliers), horizon, n_paths, seed, spacing=spacing)
+    for result in results:
+        if result["stay_probability"] >= target_probability:
+            return result["sigma_multiplier"]
+    return results[-1]["sigma_multiplier"]
@@ -0,0 +1,91 @@
+import os
+import numpy as np
+from models.forecast_cache import ForecastCache, forecast_key
+from models.vamer_model import predict_next_range
+
+CONFIG = {"model": "test", "p": 1, "q": 1, "sigma_multiplier": 2.0, "spacing": 60}
+
+def test_key_depends_on_window_and_config():
+    """Identical windows share a key; any change to data or config does not."""
+    window = [1000.0 + i for i in range(10)]
+    assert forecast_key(window, CONFIG) == forecast_key(np.array(window), dict(CONFIG))
+    assert forecast_key(window, CONFIG) != forecast_key(window[:-1] + [1.0], CONFIG)
+    assert forecast_key(window, CONFIG) != forecast_key(window, {**CONFIG, "spacing": 10})
+
+def test_memory_lru_eviction_and_counters():
+    cache = ForecastCache(max_entries=2)
+    calls = []
+    compute = lambda v: (lambda: calls.append(v) or v)
+
+    cache.get_or_compute([1.0], CONFIG, compute(1))
+    cache.get_or_compute([2.0], CONFIG, compute(2))
+    cache.get_or_compute([1.0], CONFIG, compute(1))  # hit, 1 is now most recent
+    cache.get_or_compute([3.0], CONFIG, compute(3))  # evicts 2
+    cache.get_or_compute([2.0], CONFIG, compute(2))
+
+    assert calls == [1, 2, 3, 2]
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 4}
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = ForecastCache(cache_dir=str(tmp_path))
+    cache.get_or_compute([1.0, 2.0], CONFIG, lambda: [-60, 60])
+
+    restarted = ForecastCache(cache_dir=str(tmp_path))
+    value = restarted.get_or_compute([1.0, 2.0], CONFIG, lambda: [0, 0])
+    assert value == [-60, 60]
+    assert restarted.stats["disk_hits"] == 1
+
+def test_disk_tier_size_bound(tmp_path):
+    cache = ForecastCache(cache_dir=str(tmp_path), max_disk_bytes=200)
+    for i in range(50):
+        cache.put(forecast_key([float(i)], CONFIG), list(range(5)))
+
+    total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert total <= 200
+    # The most recent entry is kept
+    assert cache.get(forecast_key([49.0], CONFIG)) == list(range(5))
+
+def test_predict_next_range_uses_cache(tmp_path):
+    """A repeated window is served from cache with an identical range."""
+    np.random.seed(0)
+    prices = (1500 + np.cumsum(np.random.normal(0, 20, 150))).tolist()
+    cache = ForecastCache(cache_dir=str(tmp_path))
+
+    first = predict_next_range(prices, cache=cache)
+    second = predict_next_range(prices, cache=cache)
+    restarted = predict_next_range(prices, cache=ForecastCache(cache_dir=str(tmp_path)))
+
+    assert first == second == restarted
+    assert isinstance(restarted, tuple)
+    # One miss for the range and one for the underlying GARCH fit
+    assert cache.stats["misses"] == 2 and cache.stats["memory_hits"] == 1
+
+def test_entries_from_previous_fitter_are_not_served(tmp_path):
+    """Disk entries keyed without the current fitter (e.g. written by arch) miss."""
+    np.random.seed(1)
+    prices = (1500 + np.cumsum(np.random.normal(0, 20, 150))).tolist()
+    cache = ForecastCache(cache_dir=str(tmp_path))
+    legacy = {"model": "vamer_garch", "p": 1, "q": 1, "sigma_multiplier": 2.0, "spacing": 60}
+    cache.put(forecast_key(prices, legacy), [-1, 1])
+
+    assert predict_next_range(prices, cache=cache) != (-1, 1)
+    assert cache.stats["misses"] == 2
+
+def test_disk_eviction_uses_index_and_low_water(tmp_path, monkeypatch):
+    """Eviction frees space below the bound without rescanning the directory."""
+    for i in range(10):
+        (tmp_path / f"{forecast_key([float(i)], CONFIG)}.json").write_text("[0, 1, 2, 3, 4]")
+    cache = ForecastCache(cache_dir=str(tmp_path), max_disk_bytes=200)
+
+    listings, evictions = [], []
+    real_listdir, real_evict = os.listdir, cache._evict_disk
+    monkeypatch.setattr(os, "listdir", lambda path: listings.append(path) or real_listdir(path))
+    monkeypatch.setattr(cache, "_evict_disk", lambda: evictions.append(1) or real_evict())
+    for i in range(10, 40):
+        cache.put(forecast_key([float(i)], CONFIG), list(range(5)))
+
+    assert listings == []
+    total = sum(os.path.getsize(tmp_path / name) for name in real_listdir(tmp_path))
+    assert total == cache._disk_bytes <= 200
+    # Evicting to the low-water mark leaves headroom, so not every put evicts
+    assert len(evictions) < 30 // 2
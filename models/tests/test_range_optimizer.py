@@ -0,0 +1,78 @@
+import numpy as np
+from models.vamer_model import fit_garch
+from models.range_simulator import simulate_paths, range_hit_stats
+from models.range_optimizer import LOG_TICK, expected_impermanent_loss, optimize_range
+
+def generate_random_walk(n=200, vol=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    return (2000 * np.exp(np.cumsum(rng.normal(0, vol, n)))).tolist()
+
+def test_impermanent_loss_matches_full_range_formula():
+    """A very wide range behaves like a V2 position: IL = hold - 2 * sqrt(r) / 2."""
+    r = np.array([0.25, 1.0, 4.0])
+    il = expected_impermanent_loss(-50.0, 50.0, np.log(r)[:, None])
+    expected = (0.5 * r + 0.5) - np.sqrt(r)
+    assert np.allclose(il, expected, atol=1e-6)
+
+def test_impermanent_loss_grows_with_concentration():
+    terminal = np.log(np.array([0.9, 1.1]))
+    wide = expected_impermanent_loss(-0.5, 0.5, terminal)
+    narrow = expected_impermanent_loss(-0.05, 0.05, terminal)
+    assert 0 < wide < narrow
+
+def test_range_is_grid_aligned_and_brackets_price():
+    prices = generate_random_walk()
+    result = optimize_range(prices, seed=1, gas_fraction=0.005)
+    current_tick = np.log(prices[-1]) / LOG_TICK
+
+    assert result["tick_lower"] % 60 == 0 and result["tick_upper"] % 60 == 0
+    assert result["tick_lower"] <= current_tick < result["tick_upper"]
+    assert result["candidates_evaluated"] == result["candidates_total"]
+    assert not result["timed_out"]
+    assert result == {**optimize_range(prices, seed=1, gas_fraction=0.005), "elapsed": result["elapsed"]}
+
+def test_stay_probability_matches_simulator():
+    """The optimizer's exit bookkeeping agrees with range_hit_stats on the same paths."""
+    prices = generate_random_walk()
+    result = optimize_range(prices, hedge_ratio=1.0, seed=2, gas_fraction=0.005)
+
+    params = fit_garch(prices)
+    drift = -0.1 * np.sqrt(params["next_variance"])
+    paths = simulate_paths(params, n_paths=4000, horizon=24, seed=2, drift=drift)
+    current_tick = np.log(prices[-1]) / LOG_TICK
+    stats = range_hit_stats(
+        paths,
+        (result["tick_lower"] - current_tick) * LOG_TICK,
+        (result["tick_upper"] - current_tick) * LOG_TICK
+    )
+    assert abs(stats["stay_probability"][0] - result["stay_probability"]) < 1e-12
+
+def test_gas_cost_widens_range():
+    """Expensive rebalances push the optimum towards wider, longer-lived ranges."""
+    prices = generate_random_walk()
+    cheap = optimize_range(prices, seed=3, gas_fraction=0.0)
+    costly = optimize_range(prices, seed=3, gas_fraction=0.02)
+
+    assert costly["tick_upper"] - costly["tick_lower"] > cheap["tick_upper"] - cheap["tick_lower"]
+    assert costly["expected_rebalances"] < cheap["expected_rebalances"]
+
+def test_time_budget_returns_best_so_far():
+    prices = generate_random_walk()
+    result = optimize_range(prices, seed=4, time_budget=0.0)
+
+    assert result["timed_out"]
+    assert 0 < result["candidates_evaluated"] < result["candidates_total"]
+    assert result["tick_lower"] < result["tick_upper"]
+
+def test_range_skews_in_trend_direction():
+    """An uptrend (hedge_ratio 0.0) centres the range above the price, a downtrend below."""
+    offsets = {0.0: [], 1.0: []}
+    for seed in range(6):
+        prices = generate_random_walk(vol=0.015, seed=seed)
+        current_tick = np.log(prices[-1]) / LOG_TICK
+        for hedge_ratio in offsets:
+            result = optimize_range(prices, hedge_ratio=hedge_ratio, gas_fraction=0.002, seed=seed)
+            offsets[hedge_ratio].append((result["tick_lower"] + result["tick_upper"]) / 2 - current_tick)
+
+    assert np.mean(offsets[0.0]) > 0 > np.mean(offsets[1.0])
+    assert sum(up > down for up, down in zip(offsets[0.0], offsets[1.0])) >= 5
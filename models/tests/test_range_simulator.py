@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from models.forecast_cache import ForecastCache
+from models.range_simulator import (
+    choose_sigma_multiplier,
+    evaluate_band_widths,
+    range_hit_stats,
+    simulate_paths,
+)
+from models.vamer_model import fit_garch, predict_next_range
+
+PARAMS = {
+    "mu": 0.0, "omega": 0.1, "alpha": 0.1, "beta": 0.85,
+    "last_resid": 0.0, "last_variance": 4.0, "next_variance": 4.0,
+    "std_resid": np.random.default_rng(0).standard_t(4, 500).tolist()
+}
+
+def generate_random_walk(n=200, vol=0.02, seed=5):
+    rng = np.random.default_rng(seed)
+    return (1500 * np.exp(np.cumsum(rng.normal(0, vol, n)))).tolist()
+
+def test_paths_shape_and_reproducibility():
+    paths = simulate_paths(PARAMS, n_paths=1000, horizon=24, seed=1)
+    assert paths.shape == (1000, 24)
+    assert np.array_equal(paths, simulate_paths(PARAMS, n_paths=1000, horizon=24, seed=1))
+
+def test_one_step_variance_matches_forecast():
+    """First-step returns have the forecast variance (2% daily sigma)."""
+    for innovations in ("normal", "bootstrap"):
+        paths = simulate_paths(PARAMS, n_paths=200000, horizon=1, seed=2, innovations=innovations)
+        assert abs(paths[:, 0].std() - 0.02) < 0.0005
+
+def test_hit_stats_ordering():
+    """Wider ranges are hit more often; stay <= time in range, stay <= terminal."""
+    paths = simulate_paths(PARAMS, n_paths=20000, horizon=24, seed=3)
+    widths = np.array([0.02, 0.05, 0.1, 0.2])
+    stats = range_hit_stats(paths, -widths, widths)
+
+    for key in ("stay_probability", "time_in_range", "terminal_probability"):
+        assert np.all(np.diff(stats[key]) >= 0)
+    assert np.all(stats["stay_probability"] <= stats["time_in_range"] + 1e-12)
+    assert np.all(stats["stay_probability"] <= stats["terminal_probability"] + 1e-12)
+
+    # Time in range agrees with a brute-force count
+    brute = ((paths >= -0.05) & (paths <= 0.05)).mean()
+    assert abs(stats["time_in_range"][1] - brute) < 1e-12
+
+def test_band_widths_and_choice():
+    prices = generate_random_walk()
+    results = evaluate_band_widths(prices, multipliers=(1.0, 2.0, 3.0), horizon=1, n_paths=20000, seed=4)
+    probabilities = [r["stay_probability"] for r in results]
+    assert probabilities == sorted(probabilities)
+    # A 2-sigma one-step band should hold roughly 95% of the time
+    assert 0.9 < results[1]["stay_probability"] < 0.99
+
+    narrow = choose_sigma_multiplier(prices, 0.5, horizon=1, n_paths=20000, seed=4)
+    wide = choose_sigma_multiplier(prices, 0.97, horizon=1, n_paths=20000, seed=4)
+    assert narrow < wide
+
+def test_band_widths_score_deployed_ticks():
+    """Candidates are scored at the spacing-aligned ticks predict_next_range
+    deploys; with a coarse spacing those differ visibly from the raw band."""
+    prices = generate_random_walk()
+    params = fit_garch(prices)
+    multipliers = (1.0, 2.0)
+    results = evaluate_band_widths(prices, multipliers, horizon=4, n_paths=20000, seed=8,
+                                   params=params, spacing=600)
+
+    paths = simulate_paths(params, n_paths=20000, horizon=4, seed=8)
+    sigma = np.sqrt(params["next_variance"]) / 100
+    for m, result in zip(multipliers, results):
+        ticks = predict_next_range(prices, m, spacing=600, cache=ForecastCache())
+        assert (result["tick_lower"], result["tick_upper"]) == ticks
+
+        log_bounds = np.array(ticks) * np.log(1.0001) - np.log(prices[-1])
+        deployed = range_hit_stats(paths, log_bounds[0], log_bounds[1])
+        raw = range_hit_stats(paths, np.log(1 - m * sigma), np.log1p(m * sigma))
+        assert result["stay_probability"] == deployed["stay_probability"][0]
+        assert result["time_in_range"] == deployed["time_in_range"][0]
+        assert abs(result["time_in_range"] - raw["time_in_range"][0]) > 0.01
+
+def test_simulation_speed():
+    """100k paths x 24 steps should take well under a second."""
+    start = time.perf_counter()
+    paths = simulate_paths(PARAMS, n_paths=100000, horizon=24, seed=6)
+    range_hit_stats(paths, [-0.05, -0.1], [0.05, 0.1])
+    assert time.perf_counter() - start < 1.0
@@ -1,21 +1,76 @@
 # models/vamer_model.py
 import pandas as pd
 import numpy as np
-from arch import arch_model
+from models.forecast_cache import get_default_cache
+from models.garch import fit_garch11
 
-def predict_next_range(price_history: list) -> tuple:
+# GARCH order (part of the forecast cache key)
+GARCH_P = 1
+GARCH_Q = 1
+
+# Estimator identity (part of the forecast cache key, so entries written by a
+# different fitter are never served)
+GARCH_FITTER = "garch11_slsqp"
+
+# Minimum number of prices for a GARCH fit; shared by the keeper and backtest
+MIN_HISTORY = 100
+
+def predict_next_range(price_history: list, sigma_multiplier: float = 2.0, spacing: int = 60,
+                       cache=None) -> tuple:
     """
     Predicts the next trading range using GARCH(1,1) Volatility Forecasting.
-    
+
     Args:
         price_history (list): List of historical closing prices.
-        
+        sigma_multiplier (float): Band half-width in forecast sigmas.
+        spacing (int): Pool tick spacing to align the range to.
+        cache (ForecastCache): Forecast cache (defaults to the process-wide cache).
+
     Returns:
         tuple: (tick_lower, tick_upper) for Uniswap V3
     """
-    if len(price_history) < 100:
-        raise ValueError("Insufficient data points")
+    if len(price_history) < MIN_HISTORY:
+        raise ValueError(f"Insufficient data points: {len(price_history)} < {MIN_HISTORY}")
+
+    config = {
+        "model": "vamer_garch",
+        "fitter": GARCH_FITTER,
+        "p": GARCH_P,
+        "q": GARCH_Q,
+        "sigma_multiplier": float(sigma_multiplier),
+        "spacing": int(spacing)
+    }
+    cache = cache if cache is not None else get_default_cache()
+    ticks = cache.get_or_compute(
+        price_history, config,
+        lambda: _fit_range(price_history, sigma_multiplier, spacing, cache)
+    )
+    return tuple(ticks)
+
+def fit_garch(price_history: list, cache=None) -> dict:
+    """
+    Fits GARCH(1,1) to percentage log returns of the price history.
+
+    Args:
+        price_history (list): List of historical closing prices.
+        cache (ForecastCache): Forecast cache (defaults to the process-wide cache).
+
+    Returns:
+        dict: mu, omega, alpha, beta (percent-return units), last_resid,
+            last_variance, next_variance (one-step forecast) and std_resid
+            (standardised residuals, used for bootstrapped simulation).
+
+    Raises:
+        ValueError: If the history is too short, or the fit did not converge
+            or produced implausible parameters.
+    """
+    if len(price_history) < MIN_HISTORY:
+        raise ValueError(f"Insufficient data points: {len(price_history)} < {MIN_HISTORY}")
+    config = {"model": "garch_params", "fitter": GARCH_FITTER, "p": GARCH_P, "q": GARCH_Q}
+    cache = cache if cache is not None else get_default_cache()
+    return cache.get_or_compute(price_history, config, lambda: _fit_garch(price_history))
 
+def _fit_garch(price_history):
     # 1. Calculate Log Returns
     df = pd.DataFrame(price_history, columns=['price'])
     df['returns'] = 100 * np.log(df['price'] / df['price'].shift(1))
@@ -23,27 +78,58 @@ def predict_next_range(price_history: list) -> tuple:
 
     # 2. Fit GARCH(1,1) Model
     # Volatility Adjusted Mean Reversion
-    model = arch_model(df['returns'], vol='Garch', p=1, q=1)
-    results = model.fit(disp='off')
-    
+    results = fit_garch11(df['returns'].to_numpy())
+    if not results['converged']:
+        raise ValueError(f"GARCH fit did not converge after {results['iterations']} iterations: {results['message']}")
+    if not results['sane']:
+        failed = [name for name, ok in results['flags'].items() if not ok]
+        raise ValueError(f"GARCH fit failed sanity checks: {', '.join(failed)}")
+
+    std_resid = results['resid'] / np.sqrt(results['sigma2'])
+
+    return {
+        "mu": results['mu'],
+        "omega": results['omega'],
+        "alpha": results['alpha'],
+        "beta": results['beta'],
+        "last_resid": float(results['resid'][-1]),
+        "last_variance": float(results['sigma2'][-1]),
+        "next_variance": results['next_variance'],
+        "std_resid": std_resid[np.isfinite(std_resid)].tolist()
+    }
+
+def _fit_range(price_history, sigma_multiplier, spacing, cache):
+    params = fit_garch(price_history, cache)
+
     # Forecast next day volatility (sigma)
-    forecast = results.forecast(horizon=1)
-    sigma = np.sqrt(forecast.variance.values[-1, :])[0] / 100 # Convert back from percentage
-    
-    current_price = price_history[-1]
-    
-    # 3. Define Range (2.0 Sigma - 95% Confidence Interval)
-    lower_price = current_price * (1 - 2.0 * sigma)
-    upper_price = current_price * (1 + 2.0 * sigma)
-    
+    sigma = np.sqrt(params['next_variance']) / 100 # Convert back from percentage
+
+    return band_ticks(price_history[-1], sigma, sigma_multiplier, spacing)
+
+def band_ticks(current_price: float, sigma: float, sigma_multiplier: float, spacing: int) -> list:
+    """
+    Converts the band current * (1 -/+ multiplier * sigma) to pool ticks.
+
+    Args:
+        current_price (float): Latest price.
+        sigma (float): One-step volatility forecast (fraction, not percent).
+        sigma_multiplier (float): Band half-width in sigmas.
+        spacing (int): Pool tick spacing to align the range to.
+
+    Returns:
+        list: [tick_lower, tick_upper], as deployed by predict_next_range.
+    """
+    # 3. Define Range (default 2.0 Sigma - 95% Confidence Interval)
+    lower_price = current_price * (1 - sigma_multiplier * sigma)
+    upper_price = current_price * (1 + sigma_multiplier * sigma)
+
     # 4. Convert to Uniswap Ticks (Base 1.0001)
     # tick = log(price) / log(1.0001)
     tick_lower = int(np.log(lower_price) / np.log(1.0001))
     tick_upper = int(np.log(upper_price) / np.log(1.0001))
-    
+
     # Align to spacing (e.g. 60 for fee tier 3000)
-    spacing = 60
     tick_lower = (tick_lower // spacing) * spacing
     tick_upper = (tick_upper // spacing) * spacing
 
-    return (tick_lower, tick_upper)
+    return [tick_lower, tick_upper]
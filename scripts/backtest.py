@@ -1,13 +1,22 @@
 import sys
 import os
 import requests
+import argparse
+import csv
+import itertools
 import numpy as np
+import pandas as pd
+from collections import deque
 from datetime import datetime, timedelta
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.vamer_model import predict_next_range
+from models.vamer_model import predict_next_range, fit_garch, MIN_HISTORY
+from models.range_simulator import simulate_paths, range_hit_stats
+from models.range_optimizer import optimize_range
+from models.trend_model import get_hedge_ratio
+from models.forecast_cache import configure_default_cache, get_default_cache
 
 def fetch_historical_data(days=365):
     """Fetches daily ETH price data from CoinGecko."""
@@ -23,15 +32,21 @@ def fetch_historical_data(days=365):
         print(f"Error fetching data: {e}")
         return []
 
-def run_backtest(prices_data, window_size=120):
+def run_backtest(prices_data, window_size=120, mc_paths=20000, range_strategy="sigma", optimizer_config=None):
     """
     Simulates the VAMR strategy on historical data.
     
     Args:
         prices_data: List of [timestamp, price]
         window_size: Number of days to use for model input
+        mc_paths: Monte Carlo paths used to predict each day's in-range probability
+        range_strategy: "sigma" (symmetric band) or "optimizer" (fee/IL/gas grid search)
+        optimizer_config: Extra optimize_range arguments (e.g. fee_rate, gas_fraction)
     """
-    print(f"\n--- Starting Backtest (Window: {window_size} days) ---")
+    print(f"\n--- Starting Backtest (Window: {window_size} days, Range: {range_strategy}) ---")
+    if window_size < MIN_HISTORY:
+        print(f"Window size must be at least {MIN_HISTORY} samples for the GARCH fit.")
+        return
     
     prices = [p[1] for p in prices_data]
     timestamps = [p[0] for p in prices_data]
@@ -43,6 +58,9 @@ def run_backtest(prices_data, window_size=120):
 
     in_range_count = 0
     total_trades = 0
+    skipped = 0
+    predicted_hit_sum = 0.0
+    brier_sum = 0.0
     
     # Portfolio Simulation (Hypothetical)
     initial_capital = 10000 # USD
@@ -65,14 +83,15 @@ def run_backtest(prices_data, window_size=120):
         current_price = prices[i]
         next_price = prices[i+1] # The price we are testing against
         
-        # 1. Run Model
-        tick_lower, tick_upper = predict_next_range(current_window)
-        
-        # Convert Ticks to Price ( Uniswap Logic: Price = 1.0001^Tick )
-        # But our model might return prices or ticks? 
-        # Let's check VAMER model output. Assuming it returns RAW TICKS.
-        price_lower = 1.0001 ** tick_lower
-        price_upper = 1.0001 ** tick_upper
+        # 1. Run Model (the keeper skips a cycle when the fit fails; so do we)
+        try:
+            price_lower, price_upper, predicted_hit = _evaluate_step(
+                current_window, i, mc_paths, range_strategy, optimizer_config
+            )
+        except ValueError as e:
+            print(f"Skipping step {i}: {e}")
+            skipped += 1
+            continue
         
         # 2. Check Result
         is_in_range = price_lower <= next_price <= price_upper
@@ -80,6 +99,8 @@ def run_backtest(prices_data, window_size=120):
             in_range_count += 1
             
         total_trades += 1
+        predicted_hit_sum += predicted_hit
+        brier_sum += (predicted_hit - is_in_range) ** 2
         
         # Logging
         date_str = datetime.fromtimestamp(timestamps[i]/1000).strftime('%Y-%m-%d')
@@ -88,13 +109,20 @@ def run_backtest(prices_data, window_size=120):
             "price": current_price,
             "next_price": next_price,
             "range": (price_lower, price_upper),
-            "in_range": is_in_range
+            "in_range": is_in_range,
+            "predicted_hit": predicted_hit
         })
 
+    if not total_trades:
+        print("Every model fit failed.")
+        return
+
     # Stats
     win_rate = (in_range_count / total_trades) * 100
-    print(f"\nProcessed {total_trades} days.")
+    print(f"\nProcessed {total_trades} days ({skipped} skipped after failed fits).")
     print(f"In-Range Rate: {win_rate:.2f}%")
+    print(f"Predicted In-Range Rate (Monte Carlo): {predicted_hit_sum / total_trades * 100:.2f}%")
+    print(f"Brier Score: {brier_sum / total_trades:.4f}")
     
     # Simple Est APY Calculation:
     # Assume 0.3% fee tier. Daily volume / TVL = turnover.
@@ -102,6 +130,8 @@ def run_backtest(prices_data, window_size=120):
     # Let's assume a base APY of 20% * (In-Range / 100)?
     # Or just print the Win Rate which is the key metric for VAMR.
     
+    print(f"Forecast Cache: {get_default_cache().stats}")
+
     print("\n--- Strategy Performance ---")
     print(f"Total Days: {total_trades}")
     print(f"Days In Range: {in_range_count}")
@@ -112,7 +142,273 @@ def run_backtest(prices_data, window_size=120):
     else:
         print("Verdict: NEEDS TUNING")
 
+def _evaluate_step(current_window, seed, mc_paths, range_strategy, optimizer_config):
+    """Returns (price_lower, price_upper, predicted_hit) for one backtest step."""
+    if range_strategy == "optimizer":
+        # Seeded and without a time budget so replays are reproducible
+        tick_lower, tick_upper = _optimized_range(current_window, seed, optimizer_config or {})
+    else:
+        tick_lower, tick_upper = predict_next_range(current_window)
+    
+    # Convert Ticks to Price ( Uniswap Logic: Price = 1.0001^Tick )
+    price_lower = 1.0001 ** tick_lower
+    price_upper = 1.0001 ** tick_upper
+    
+    # Predicted probability that next_price lands in this range. The window
+    # ends at prices[i-1], so next_price is two steps past the model's input
+    window_price = current_window[-1]
+    paths = simulate_paths(fit_garch(current_window), n_paths=mc_paths, horizon=2, seed=seed)
+    predicted_hit = float(range_hit_stats(
+        paths, np.log(price_lower / window_price), np.log(price_upper / window_price)
+    )["terminal_probability"][0])
+    return price_lower, price_upper, predicted_hit
+
+def _optimized_range(window, seed, optimizer_config):
+    result = optimize_range(
+        window, hedge_ratio=get_hedge_ratio(window), seed=seed, time_budget=None, **optimizer_config
+    )
+    return result["tick_lower"], result["tick_upper"]
+
+# --- Streaming (out-of-core) backtest ---
+
+RESULT_COLUMNS = ["timestamp", "price", "next_price", "price_lower", "price_upper", "in_range", "predicted_hit"]
+
+def _to_millis(values):
+    """Normalises unix seconds, unix milliseconds or ISO-8601 strings to int64 milliseconds."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        values = values.astype(np.float64)
+        return np.where(values > 1e11, values, values * 1000).astype(np.int64)
+    return (pd.to_datetime(values, utc=True).asi8 // 1_000_000).astype(np.int64)
+
+def iter_price_chunks(path, chunk_size=100_000):
+    """
+    Yields (timestamps_ms, prices) array chunks without loading the whole file.
+
+    Supported inputs:
+        .npy      1-D prices (timestamps = sample index) or (n, 2) [timestamp, price],
+                  read through a memory map
+        .parquet  `timestamp` and `price` columns, read batch by batch (needs pyarrow)
+        .csv      `timestamp` and `price` columns, read with pandas chunks
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".npy":
+        data = np.load(path, mmap_mode="r")
+        for start in range(0, len(data), chunk_size):
+            chunk = np.array(data[start:start + chunk_size], dtype=np.float64)
+            if chunk.ndim == 1:
+                yield np.arange(start, start + len(chunk), dtype=np.int64), chunk
+            else:
+                yield _to_millis(chunk[:, 0]), chunk[:, 1]
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=["timestamp", "price"]):
+            columns = batch.to_pydict()
+            yield _to_millis(columns["timestamp"]), np.asarray(columns["price"], dtype=np.float64)
+    elif suffix == ".csv":
+        for frame in pd.read_csv(path, usecols=["timestamp", "price"], chunksize=chunk_size):
+            yield _to_millis(frame["timestamp"].to_numpy()), frame["price"].to_numpy(dtype=np.float64)
+    else:
+        raise ValueError(f"Unsupported price file: {path}")
+
+def iter_samples(chunks):
+    """Flattens (timestamps, prices) chunks into (timestamp, price) samples."""
+    for timestamps, prices in chunks:
+        yield from zip(timestamps.tolist(), prices.tolist())
+
+def iter_windows(samples, window_size, step=1):
+    """
+    Yields (index, window, timestamp, current_price, next_price) every `step`
+    samples, holding only window_size + 2 samples in memory.
+
+    Matches run_backtest: window = prices[i-window_size:i], current = prices[i],
+    next = prices[i+1].
+    """
+    buffer = deque(maxlen=window_size + 2)
+    for position, (timestamp, price) in enumerate(samples):
+        buffer.append((timestamp, price))
+        i = position - 1
+        if len(buffer) == buffer.maxlen and (i - window_size) % step == 0:
+            window = np.fromiter((p for _, p in itertools.islice(buffer, window_size)), dtype=np.float64, count=window_size)
+            current_timestamp, current_price = buffer[window_size]
+            yield i, window, current_timestamp, current_price, buffer[window_size + 1][1]
+
+class ResultWriter:
+    """
+    Appends per-step backtest rows to a columnar file in bounded batches.
+
+    Writes Parquet through pyarrow's ParquetWriter (one row group per flush)
+    and falls back to CSV for a .csv path.
+
+    Args:
+        path (str): Output file (.parquet or .csv).
+        flush_rows (int): Rows buffered before each write.
+    """
+
+    def __init__(self, path, flush_rows=10_000):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.rows_written = 0
+        self._columns = {name: [] for name in RESULT_COLUMNS}
+        self._writer = None
+        self._csv_file = None
+        self._parquet = not path.lower().endswith(".csv")
+
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            self._schema = pa.schema([
+                ("timestamp", pa.int64()),
+                ("price", pa.float64()),
+                ("next_price", pa.float64()),
+                ("price_lower", pa.float64()),
+                ("price_upper", pa.float64()),
+                ("in_range", pa.bool_()),
+                ("predicted_hit", pa.float64()),
+            ])
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._csv_file = open(path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(RESULT_COLUMNS)
+
+    def write(self, **row):
+        for name in RESULT_COLUMNS:
+            self._columns[name].append(row[name])
+        if len(self._columns["timestamp"]) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        count = len(self._columns["timestamp"])
+        if not count:
+            return
+        if self._parquet:
+            self._writer.write_table(self._pa.Table.from_pydict(self._columns, schema=self._schema))
+        else:
+            self._csv.writerows(zip(*(self._columns[name] for name in RESULT_COLUMNS)))
+            self._csv_file.flush()
+        self.rows_written += count
+        self._columns = {name: [] for name in RESULT_COLUMNS}
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_streaming_backtest(source, output_path=None, window_size=120, step=1, mc_paths=20000,
+                           chunk_size=100_000, range_strategy="sigma", optimizer_config=None,
+                           flush_rows=10_000):
+    """
+    Out-of-core variant of run_backtest for long (e.g. multi-year minute) histories.
+
+    Prices stream through a generator pipeline (file chunks -> samples ->
+    rolling windows); only the window, the running aggregates and one output
+    batch are held in memory, so peak memory does not grow with the history.
+
+    Args:
+        source: Price file path (.npy, .parquet, .csv) or an iterable of
+            (timestamps, prices) chunks
+        output_path: Optional .parquet or .csv file for per-step results
+        window_size: Number of samples used for model input
+        step: Evaluate every `step` samples (e.g. 60 for hourly on minute data)
+        mc_paths: Monte Carlo paths used to predict each step's in-range probability
+        chunk_size: Rows read per file chunk
+        range_strategy: "sigma" (symmetric band) or "optimizer" (fee/IL/gas grid search)
+        optimizer_config: Extra optimize_range arguments
+        flush_rows: Result rows buffered per write
+
+    Returns:
+        dict: steps, skipped, in_range, in_range_rate, predicted_in_range_rate, brier_score
+    """
+    print(f"\n--- Starting Streaming Backtest (Window: {window_size}, Step: {step}, Range: {range_strategy}) ---")
+    if window_size < MIN_HISTORY:
+        raise ValueError(f"window_size must be at least {MIN_HISTORY} samples for the GARCH fit")
+
+    chunks = iter_price_chunks(source, chunk_size) if isinstance(source, (str, os.PathLike)) else source
+    writer = ResultWriter(output_path, flush_rows) if output_path else None
+
+    steps = 0
+    skipped = 0
+    in_range_count = 0
+    predicted_hit_sum = 0.0
+    brier_sum = 0.0
+    try:
+        for i, window, timestamp, current_price, next_price in iter_windows(iter_samples(chunks), window_size, step):
+            try:
+                price_lower, price_upper, predicted_hit = _evaluate_step(
+                    window, i, mc_paths, range_strategy, optimizer_config
+                )
+            except ValueError as e:
+                print(f"Skipping step {i}: {e}")
+                skipped += 1
+                continue
+            is_in_range = price_lower <= next_price <= price_upper
+
+            steps += 1
+            in_range_count += is_in_range
+            predicted_hit_sum += predicted_hit
+            brier_sum += (predicted_hit - is_in_range) ** 2
+
+            if writer:
+                writer.write(
+                    timestamp=int(timestamp), price=current_price, next_price=next_price,
+                    price_lower=price_lower, price_upper=price_upper,
+                    in_range=bool(is_in_range), predicted_hit=predicted_hit
+                )
+    finally:
+        if writer:
+            writer.close()
+
+    if not steps:
+        print("Not enough data for window size.")
+        return None
+
+    summary = {
+        "steps": steps,
+        "skipped": skipped,
+        "in_range": in_range_count,
+        "in_range_rate": in_range_count / steps,
+        "predicted_in_range_rate": predicted_hit_sum / steps,
+        "brier_score": brier_sum / steps
+    }
+    print(f"Processed {steps} steps ({skipped} skipped after failed fits).")
+    print(f"In-Range Rate: {summary['in_range_rate'] * 100:.2f}%")
+    print(f"Predicted In-Range Rate (Monte Carlo): {summary['predicted_in_range_rate'] * 100:.2f}%")
+    print(f"Brier Score: {summary['brier_score']:.4f}")
+    print(f"Forecast Cache: {get_default_cache().stats}")
+    if writer:
+        print(f"Results written to {output_path} ({writer.rows_written} rows)")
+    return summary
+
 if __name__ == "__main__":
-    data = fetch_historical_data()
-    if data:
-        run_backtest(data)
+    # Persist forecasts so reruns over mostly unchanged data skip refitting
+    configure_default_cache(cache_dir=os.getenv("FORECAST_CACHE_DIR", ".forecast_cache"))
+
+    parser = argparse.ArgumentParser(description="Backtest the VAMR range strategy.")
+    parser.add_argument("--stream", help="Stream prices from a .npy, .parquet or .csv file instead of CoinGecko")
+    parser.add_argument("--output", help="Per-step results file for --stream (.parquet or .csv)")
+    parser.add_argument("--window", type=int, default=120, help="Samples of model input")
+    parser.add_argument("--step", type=int, default=1, help="Evaluate every N samples (--stream only)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows read per chunk (--stream only)")
+    parser.add_argument("--range-strategy", default=os.getenv("RANGE_STRATEGY", "sigma"), choices=["sigma", "optimizer"])
+    args = parser.parse_args()
+
+    if args.stream:
+        run_streaming_backtest(
+            args.stream, args.output, window_size=args.window, step=args.step,
+            chunk_size=args.chunk_size, range_strategy=args.range_strategy
+        )
+    else:
+        data = fetch_historical_data()
+        if data:
+            run_backtest(data, window_size=args.window, range_strategy=args.range_strategy)
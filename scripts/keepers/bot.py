@@ -1,12 +1,11 @@
 # scripts/keepers/bot.py
-import time
 import os
 import json
 import requests
 import sys
 import signal
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from web3 import Web3
 from dotenv import load_dotenv
 from eth_abi import encode
@@ -30,15 +29,30 @@ def signal_handler(signum, frame):
     logger.info(f"Received signal {signum}. Initiating graceful shutdown...")
     shutdown_requested = True
 
+def profile_signal_handler(signum, frame):
+    """Arm the cycle profiler (kill -USR1 <pid>)."""
+    profiler.handle_signal(signum, frame)
+
 # Register signal handlers
 signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
+if hasattr(signal, "SIGUSR1"):
+    signal.signal(signal.SIGUSR1, profile_signal_handler)
 
 # Add project root to sys.path to allow importing models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from models.vamer_model import predict_next_range
+from models.vamer_model import predict_next_range, MIN_HISTORY
 from models.trend_model import get_hedge_ratio
+from models.forecast_cache import configure_default_cache, get_default_cache
+from models.range_simulator import choose_sigma_multiplier
+from models.range_optimizer import optimize_range
+from scripts.keepers.signature_prover import get_signer
+from scripts.keepers.onchain_prices import OnchainPriceFeed
+from scripts.keepers.telemetry import TelemetrySpool
+from scripts.keepers.rollups import RollupWriter
+from scripts.keepers.clock import SystemClock
+from scripts.keepers.profiling import CycleProfiler
 
 load_dotenv()
 
@@ -46,18 +60,72 @@ load_dotenv()
 RPC_URL = os.getenv("RPC_URL", "http://localhost:8545")
 PRIVATE_KEY = os.getenv("KEEPER_PK")
 VAULT_ADDRESS = os.getenv("VAULT_ADDRESS")
+# Comma-separated list for keepers serving several vaults (defaults to VAULT_ADDRESS)
+VAULT_ADDRESSES = [a.strip() for a in os.getenv("VAULT_ADDRESSES", VAULT_ADDRESS or "").split(",") if a.strip()]
+
+COINGECKO_API_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+# Daily closes to fetch; must cover the GARCH fit's MIN_HISTORY
+MARKET_DATA_DAYS = int(os.getenv("MARKET_DATA_DAYS", "120"))
+
+# Price source: "coingecko" (daily closes), "onchain" (pool Swap candles) or "twap" (pool oracle)
+PRICE_SOURCE = os.getenv("PRICE_SOURCE", "coingecko").lower()
+POOL_ADDRESS = os.getenv("POOL_ADDRESS")
+POOL_TOKEN0_DECIMALS = int(os.getenv("POOL_TOKEN0_DECIMALS", "6"))
+POOL_TOKEN1_DECIMALS = int(os.getenv("POOL_TOKEN1_DECIMALS", "18"))
+POOL_INVERT_PRICE = os.getenv("POOL_INVERT_PRICE", "true").lower() == "true"
+CANDLE_INTERVAL_SECONDS = int(os.getenv("CANDLE_INTERVAL_SECONDS", "3600"))
+PRICE_LOOKBACK_BLOCKS = int(os.getenv("PRICE_LOOKBACK_BLOCKS", "36000"))
+TWAP_PERIODS = int(os.getenv("TWAP_PERIODS", "120"))
+
+# Local write-behind spool for Supabase telemetry
+TELEMETRY_SPOOL_PATH = os.getenv("TELEMETRY_SPOOL_PATH", "keeper_telemetry.db")
+# Maintain hourly/daily/weekly dashboard rollups as telemetry is flushed
+TELEMETRY_ROLLUPS = os.getenv("TELEMETRY_ROLLUPS", "true").lower() == "true"
+
+# Monte Carlo band selection: narrowest sigma band whose simulated probability of
+# staying in range over BAND_HORIZON_STEPS meets the target (unset = fixed 2.0 sigma)
+BAND_TARGET_PROBABILITY = float(os.getenv("BAND_TARGET_PROBABILITY", "0") or 0)
+BAND_HORIZON_STEPS = int(os.getenv("BAND_HORIZON_STEPS", "1"))
+
+# Range selection: "sigma" (symmetric band) or "optimizer" (fee/IL/gas grid search)
+RANGE_STRATEGY = os.getenv("RANGE_STRATEGY", "sigma").lower()
+RANGE_TIME_BUDGET_SECONDS = float(os.getenv("RANGE_TIME_BUDGET_SECONDS", "2.0"))
+RANGE_HORIZON_STEPS = int(os.getenv("RANGE_HORIZON_STEPS", "24"))
+RANGE_FEE_RATE = float(os.getenv("RANGE_FEE_RATE", "0.00005")) # Full-range fee yield per step
+POSITION_VALUE_USD = float(os.getenv("POSITION_VALUE_USD", "100000"))
+REBALANCE_GAS_UNITS = 500000
+
+# On-disk forecast cache so a restarted keeper does not refit the same window
+FORECAST_CACHE_DIR = os.getenv("FORECAST_CACHE_DIR", ".forecast_cache")
+
+# Cycle profiling: SIGUSR1 (or KEEPER_PROFILE_ON_START) captures cProfile and
+# tracemalloc output for the next KEEPER_PROFILE_CYCLES cycles
+KEEPER_PROFILE_DIR = os.getenv("KEEPER_PROFILE_DIR", "profiles")
+KEEPER_PROFILE_CYCLES = int(os.getenv("KEEPER_PROFILE_CYCLES", "3"))
+KEEPER_PROFILE_ON_START = os.getenv("KEEPER_PROFILE_ON_START", "false").lower() == "true"
+profiler = CycleProfiler(KEEPER_PROFILE_DIR, KEEPER_PROFILE_CYCLES)
 
 # Initialize Web3
 if not RPC_URL:
     logger.error("Error: RPC_URL not set in .env")
     sys.exit(1)
 
+if PRICE_SOURCE == "coingecko" and MARKET_DATA_DAYS < MIN_HISTORY:
+    logger.warning(f"MARKET_DATA_DAYS={MARKET_DATA_DAYS} is below the model's {MIN_HISTORY}-point minimum; every strategy run will be skipped")
+
 w3 = Web3(Web3.HTTPProvider(RPC_URL))
 
+# Source of time for sleeps and timestamps (replaced by a simulated clock in replays)
+clock = SystemClock()
+
 # CoreVault Minimal ABI for rebalance and totalAssets
 VAULT_ABI = [
     {
-        "inputs": [{"internalType": "bytes", "name": "vectorData", "type": "bytes"}],
+        "inputs": [
+            {"internalType": "bytes", "name": "zkProof", "type": "bytes"},
+            {"internalType": "int24", "name": "tickLower", "type": "int24"},
+            {"internalType": "int24", "name": "tickUpper", "type": "int24"}
+        ],
         "name": "rebalance",
         "outputs": [],
         "stateMutability": "nonpayable",
@@ -73,9 +141,9 @@ VAULT_ABI = [
 ]
 
 def fetch_market_data(max_retries=3):
-    """Fetches 90 days of daily ETH/USD data from CoinGecko with retry logic."""
+    """Fetches MARKET_DATA_DAYS of daily ETH/USD data from CoinGecko with retry logic."""
     logger.info("Fetching market data from CoinGecko...")
-    url = "https://api.coingecko.com/api/v3/coins/ethereum/market_chart?vs_currency=usd&days=90&interval=daily"
+    url = f"{COINGECKO_API_URL}/coins/ethereum/market_chart?vs_currency=usd&days={MARKET_DATA_DAYS}&interval=daily"
     
     for attempt in range(max_retries):
         try:
@@ -93,30 +161,81 @@ def fetch_market_data(max_retries=3):
             logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
             if attempt < max_retries - 1:
                 logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
             else:
                 logger.error(f"Failed to fetch market data after {max_retries} attempts")
                 return []
 
-def store_price_history(supabase, prices):
-    """Stores price history in Supabase for caching."""
-    if not supabase or not prices:
+def fetch_onchain_market_data():
+    """
+    Builds price history from the configured Uniswap V3 pool (Swap candles or TWAP).
+
+    Returns:
+        tuple: (prices, timestamps) with unix-second interval start times
+    """
+    if not POOL_ADDRESS:
+        logger.error("PRICE_SOURCE is on-chain but POOL_ADDRESS is not set")
+        return [], None
+
+    feed = OnchainPriceFeed(
+        w3, POOL_ADDRESS,
+        decimals0=POOL_TOKEN0_DECIMALS,
+        decimals1=POOL_TOKEN1_DECIMALS,
+        invert=POOL_INVERT_PRICE,
+        interval_seconds=CANDLE_INTERVAL_SECONDS
+    )
+    try:
+        if PRICE_SOURCE == "twap":
+            logger.info(f"Reading {TWAP_PERIODS} TWAP points from pool {POOL_ADDRESS}...")
+            timestamps, prices = feed.fetch_twap_series(TWAP_PERIODS)
+        else:
+            logger.info(f"Building candles from pool {POOL_ADDRESS} Swap logs...")
+            timestamps, prices = feed.fetch_price_series(PRICE_LOOKBACK_BLOCKS)
+        logger.info(f"Successfully built {len(prices)} on-chain price points")
+        return prices, timestamps
+    except Exception as e:
+        logger.error(f"Failed to fetch on-chain market data: {e}")
+        return [], None
+
+def fetch_price_history():
+    """
+    Fetches price history from the configured PRICE_SOURCE.
+
+    Returns:
+        tuple: (prices, timestamps); timestamps is None for CoinGecko daily closes
+    """
+    if PRICE_SOURCE in ("onchain", "twap"):
+        return fetch_onchain_market_data()
+    return fetch_market_data(), None
+
+def store_price_history(telemetry, prices, timestamps=None):
+    """
+    Spools the last 30 price points for Supabase caching.
+
+    On-chain candles and TWAPs are stored at their own interval timestamps.
+    CoinGecko closes are daily, so without timestamps they are stamped at
+    the last 30 midnights.
+    """
+    if not telemetry or not prices:
         return
     
     try:
-        # Store last 30 days of prices
-        for i, price in enumerate(prices[-30:]):
-            timestamp = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            timestamp = timestamp.replace(day=timestamp.day - (30 - i))
-            
-            data = {
+        if timestamps is not None:
+            stamps = [datetime.fromtimestamp(t, tz=timezone.utc).replace(tzinfo=None) for t in timestamps[-30:]]
+        else:
+            today = clock.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            stamps = [today - timedelta(days=30 - i) for i in range(len(prices[-30:]))]
+
+        records = []
+        for timestamp, price in zip(stamps, prices[-30:]):
+            records.append({
                 "timestamp": timestamp.isoformat(),
                 "symbol": "ETH",
                 "price_usd": float(price),
-                "source": "coingecko"
-            }
-            supabase.table("price_history").upsert(data, on_conflict="timestamp,symbol").execute()
-        print("Price history cached in Supabase")
+                "source": PRICE_SOURCE
+            })
+        telemetry.write_many("price_history", records)
+        print("Price history spooled for Supabase")
     except Exception as e:
         print(f"Failed to store price history: {e}")
 
@@ -139,29 +258,31 @@ def calculate_apy(vault_contract, price_history):
         print(f"Error calculating APY: {e}")
         return 18.25, 0.0
 
-def store_apy_history(supabase, apy, tvl):
-    """Stores APY calculation in Supabase."""
-    if not supabase:
+def store_apy_history(telemetry, apy, tvl, vault_address=None):
+    """Spools APY calculation for Supabase."""
+    if not telemetry:
         return
     
+    vault_address = vault_address or VAULT_ADDRESS
     try:
         data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": clock.utcnow().isoformat(),
             "apy": float(apy),
             "tvl": float(tvl),
-            "vault_address": VAULT_ADDRESS.lower() if VAULT_ADDRESS else "",
+            "vault_address": vault_address.lower() if vault_address else "",
             "metadata": json.dumps({"source": "keeper_bot"})
         }
-        supabase.table("apy_history").insert(data).execute()
-        print(f"APY history stored: {apy:.2f}%, TVL: ${tvl:,.2f}")
+        telemetry.write("apy_history", data)
+        print(f"APY history spooled: {apy:.2f}%, TVL: ${tvl:,.2f}")
     except Exception as e:
         print(f"Failed to store APY history: {e}")
 
-def store_rebalance_event(supabase, tick_lower, tick_upper, tx_hash, receipt):
-    """Stores rebalance event in Supabase."""
-    if not supabase:
+def store_rebalance_event(telemetry, tick_lower, tick_upper, tx_hash, receipt, vault_address=None):
+    """Spools rebalance event for Supabase."""
+    if not telemetry:
         return
     
+    vault_address = vault_address or VAULT_ADDRESS
     try:
         # Calculate prices from ticks (simplified)
         price_lower = 1.0001 ** tick_lower
@@ -175,9 +296,9 @@ def store_rebalance_event(supabase, tick_lower, tick_upper, tx_hash, receipt):
         cost_eth = w3.from_wei(gas_used * gas_price_wei, 'ether')
         
         data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": clock.utcnow().isoformat(),
             "tx_hash": tx_hash.hex(),
-            "vault_address": VAULT_ADDRESS.lower() if VAULT_ADDRESS else "",
+            "vault_address": vault_address.lower() if vault_address else "",
             "tick_lower": tick_lower,
             "tick_upper": tick_upper,
             "price_lower": float(price_lower),
@@ -186,28 +307,48 @@ def store_rebalance_event(supabase, tick_lower, tick_upper, tx_hash, receipt):
             "gas_price_gwei": float(gas_price_gwei),
             "cost_eth": float(cost_eth),
             "block_number": receipt.get('blockNumber', 0),
-            "keeper_address": w3.eth.account.from_key(PRIVATE_KEY).address if PRIVATE_KEY else "",
+            "keeper_address": get_signer(PRIVATE_KEY).address if PRIVATE_KEY else "",
             "metadata": json.dumps({"status": "success"})
         }
-        supabase.table("rebalance_events").insert(data).execute()
-        print(f"Rebalance event stored: TX {tx_hash.hex()[:10]}...")
+        telemetry.write("rebalance_events", data)
+        print(f"Rebalance event spooled: TX {tx_hash.hex()[:10]}...")
     except Exception as e:
         print(f"Failed to store rebalance event: {e}")
 
 def run_strategy(price_history):
     """Executes the off-chain models to get the optimal vector."""
-    if not price_history or len(price_history) < 30:
-        print("Insufficient price history.")
+    if not price_history or len(price_history) < MIN_HISTORY:
+        print(f"Insufficient price history ({len(price_history or [])} < {MIN_HISTORY} points).")
         return None, None
 
     print("Running VAMER and Trend models...")
     
     try:
-        # 1. Volatility Model (Ticks)
-        tick_lower, tick_upper = predict_next_range(price_history)
-        
-        # 2. Trend Model (Hedge Ratio - Reserved for future use/logging)
+        # 1. Trend Model (Hedge Ratio - skews the optimizer's range)
         hedge_ratio = get_hedge_ratio(price_history)
+
+        # 2. Volatility Model (Ticks)
+        if RANGE_STRATEGY == "optimizer":
+            result = optimize_range(
+                price_history,
+                hedge_ratio=hedge_ratio,
+                horizon=RANGE_HORIZON_STEPS,
+                fee_rate=RANGE_FEE_RATE,
+                gas_fraction=estimate_gas_fraction(price_history[-1]),
+                time_budget=RANGE_TIME_BUDGET_SECONDS
+            )
+            tick_lower, tick_upper = result["tick_lower"], result["tick_upper"]
+            print(f"Range optimizer: score {result['score']:.5f} "
+                  f"({result['candidates_evaluated']}/{result['candidates_total']} candidates, "
+                  f"{result['elapsed']:.2f}s{', timed out' if result['timed_out'] else ''})")
+        elif BAND_TARGET_PROBABILITY:
+            sigma_multiplier = choose_sigma_multiplier(
+                price_history, BAND_TARGET_PROBABILITY, horizon=BAND_HORIZON_STEPS
+            )
+            print(f"Monte Carlo band: {sigma_multiplier} sigma for {BAND_TARGET_PROBABILITY:.0%} stay-in-range")
+            tick_lower, tick_upper = predict_next_range(price_history, sigma_multiplier=sigma_multiplier)
+        else:
+            tick_lower, tick_upper = predict_next_range(price_history)
         
         print(f"Strategy Result: Range [{tick_lower}, {tick_upper}], Hedge Ratio: {hedge_ratio}")
         return tick_lower, tick_upper
@@ -216,6 +357,15 @@ def run_strategy(price_history):
         print(f"Strategy execution failed: {e}")
         return None, None
 
+def estimate_gas_fraction(eth_price):
+    """Rebalance gas cost as a fraction of POSITION_VALUE_USD (0 if gas price is unavailable)."""
+    try:
+        cost_eth = float(w3.from_wei(REBALANCE_GAS_UNITS * w3.eth.gas_price, 'ether'))
+    except Exception as e:
+        logger.warning(f"Gas price unavailable for range optimizer: {e}")
+        return 0.0
+    return cost_eth * eth_price / POSITION_VALUE_USD
+
 def check_profitability(tick_lower, tick_upper):
     """
     Simulates the transaction to estimate gas vs expected yield improvement.
@@ -223,8 +373,7 @@ def check_profitability(tick_lower, tick_upper):
     print("Checking gas prices...")
     try:
         gas_price = w3.eth.gas_price
-        estimated_gas_units = 500000 
-        cost_eth = w3.from_wei(estimated_gas_units * gas_price, 'ether')
+        cost_eth = w3.from_wei(REBALANCE_GAS_UNITS * gas_price, 'ether')
         
         print(f"Estimated Rebalance Cost: {cost_eth:.5f} ETH")
         
@@ -238,36 +387,29 @@ def check_profitability(tick_lower, tick_upper):
         print(f"Profitability check failed: {e}")
         return False
 
-def rebalance(tick_lower, tick_upper, supabase=None):
+def rebalance(tick_lower, tick_upper, telemetry=None, vault_address=None):
     """Submits the rebalance transaction to the blockchain."""
-    if not PRIVATE_KEY or not VAULT_ADDRESS:
+    vault_address = vault_address or VAULT_ADDRESS
+    if not PRIVATE_KEY or not vault_address:
         print("Missing PRIVATE_KEY or VAULT_ADDRESS. Skipping execution.")
         return None
 
     try:
-        account = w3.eth.account.from_key(PRIVATE_KEY)
-        vault_contract = w3.eth.contract(address=VAULT_ADDRESS, abi=VAULT_ABI)
+        signer = get_signer(PRIVATE_KEY)
+        vault_contract = w3.eth.contract(address=vault_address, abi=VAULT_ABI)
         
         # Generate cryptographic proof (ECDSA signature)
-        from eth_account.messages import encode_defunct
-        
-        current_block = w3.eth.block_number
-        message_hash = w3.solidity_keccak(
-            ['int24', 'int24', 'uint256'],
-            [tick_lower, tick_upper, current_block]
-        )
-        
-        message = encode_defunct(hexstr=message_hash.hex())
-        signed_message = account.sign_message(message)
-        zk_proof = signed_message.signature
+        # ZkVerifier checks block.number at execution, i.e. the next block
+        target_block = w3.eth.block_number + 1
+        zk_proof = signer.sign(tick_lower, tick_upper, target_block)
         
         print(f"Generated signature proof: 0x{zk_proof.hex()[:16]}...")
         print(f"Building transaction for Rebalance([{tick_lower}, {tick_upper}])...")
         
         # Build Transaction
         tx = vault_contract.functions.rebalance(zk_proof, tick_lower, tick_upper).build_transaction({
-            'from': account.address,
-            'nonce': w3.eth.get_transaction_count(account.address),
+            'from': signer.address,
+            'nonce': w3.eth.get_transaction_count(signer.address),
             'gas': 1000000,
             'gasPrice': w3.eth.gas_price
         })
@@ -281,10 +423,13 @@ def rebalance(tick_lower, tick_upper, supabase=None):
         
         # Wait for receipt
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt.get('status', 1) == 0:
+            print(f"Rebalance TX reverted in block {receipt['blockNumber']}")
+            return None
         print(f"Transaction confirmed in block {receipt['blockNumber']}")
         
         # Store rebalance event in Supabase
-        store_rebalance_event(supabase, tick_lower, tick_upper, tx_hash, receipt)
+        store_rebalance_event(telemetry, tick_lower, tick_upper, tx_hash, receipt, vault_address)
         
         return receipt
         
@@ -292,41 +437,96 @@ def rebalance(tick_lower, tick_upper, supabase=None):
         print(f"Rebalance transaction failed: {e}")
         return None
 
-def main():
-    """Main bot loop with graceful shutdown and error recovery."""
+def run_cycle(telemetry, update_heartbeat):
+    """
+    Runs one keeper cycle: fetch prices, run the models and rebalance every vault.
+
+    Returns:
+        bool: True if at least one vault was rebalanced
+    """
+    history, timestamps = fetch_price_history()
+    if not history:
+        return False
+
+    # Store price history for caching
+    store_price_history(telemetry, history, timestamps)
+
+    # Run strategy models
+    lower, upper = run_strategy(history)
+    if lower is None or upper is None:
+        return False
+
+    rebalanced = False
+    for vault_address in VAULT_ADDRESSES:
+        if not check_profitability(lower, upper):
+            continue
+
+        # Execute rebalance
+        receipt = rebalance(lower, upper, telemetry, vault_address)
+
+        if receipt:
+            # Calculate and store APY
+            vault_contract = w3.eth.contract(address=vault_address, abi=VAULT_ABI)
+            apy, tvl = calculate_apy(vault_contract, history)
+            store_apy_history(telemetry, apy, tvl, vault_address)
+
+            update_heartbeat(status="active", metadata={
+                "action": "rebalance",
+                "vault": vault_address,
+                "range": [lower, upper],
+                "apy": apy,
+                "tvl": tvl
+            })
+            rebalanced = True
+    return rebalanced
+
+def main(supabase=None):
+    """
+    Main bot loop with graceful shutdown and error recovery.
+
+    Args:
+        supabase: Optional pre-built Supabase client (otherwise created from env)
+    """
     logger.info("="*60)
     logger.info("Starting Liquidity Vector Keeper Bot...")
     logger.info("="*60)
     
     # Supabase Setup
     SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    supabase = None
+    # Rollup merges are granted to service_role only, so prefer the service key
+    SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+    telemetry = None
     
-    if SUPABASE_URL and SUPABASE_KEY:
-        from supabase import create_client, Client
+    if supabase is not None or (SUPABASE_URL and SUPABASE_KEY):
         try:
-            supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            if supabase is None:
+                from supabase import create_client
+                supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+            if TELEMETRY_ROLLUPS and not os.getenv("SUPABASE_SERVICE_KEY"):
+                logger.warning("SUPABASE_SERVICE_KEY not set; rollup merges will be refused with a non-service key")
+            on_flushed = RollupWriter(supabase) if TELEMETRY_ROLLUPS else None
+            telemetry = TelemetrySpool(TELEMETRY_SPOOL_PATH, supabase, on_flushed=on_flushed).start()
             logger.info("✓ Connected to Supabase for monitoring")
+            logger.info(f"✓ Telemetry spool: {TELEMETRY_SPOOL_PATH} ({telemetry.pending()} pending)")
         except Exception as e:
             logger.error(f"Failed to connect to Supabase: {e}")
     else:
-        logger.warning("SUPABASE_URL or SUPABASE_KEY not set. Monitoring disabled.")
+        logger.warning("SUPABASE_URL or SUPABASE_SERVICE_KEY/SUPABASE_KEY not set. Monitoring disabled.")
 
     def update_heartbeat(status="healthy", metadata=None):
-        """Updates the bot's heartbeat in Supabase."""
-        if not supabase:
+        """Spools the bot's heartbeat for Supabase."""
+        if not telemetry:
             return
 
         try:
             data = {
                 "bot_id": "liquidity-vector-keeper",
                 "status": status,
-                "last_seen": datetime.utcnow().isoformat(),
+                "last_seen": clock.utcnow().isoformat(),
                 "metadata": json.dumps(metadata or {})
             }
-            supabase.table("bot_heartbeats").upsert(data).execute()
-            logger.debug("Heartbeat updated")
+            telemetry.write("bot_heartbeats", data)
+            logger.debug("Heartbeat spooled")
         except Exception as e:
             logger.error(f"Failed to update heartbeat: {e}")
 
@@ -334,46 +534,32 @@ def main():
     if not w3.is_connected():
         logger.error("Could not connect to RPC")
         update_heartbeat(status="error", metadata={"error": "RPC Connection Failed"})
+        if telemetry:
+            telemetry.close()
         return
     
     logger.info(f"✓ Connected to RPC: {RPC_URL[:50]}...")
-    logger.info(f"✓ Vault Address: {VAULT_ADDRESS}")
+    logger.info(f"✓ Vault Addresses: {', '.join(VAULT_ADDRESSES)}")
+    if FORECAST_CACHE_DIR:
+        configure_default_cache(cache_dir=FORECAST_CACHE_DIR)
+        logger.info(f"✓ Forecast cache: {FORECAST_CACHE_DIR}")
+    if KEEPER_PROFILE_ON_START:
+        profiler.request()
+        logger.info(f"✓ Profiling the first {KEEPER_PROFILE_CYCLES} cycles into {KEEPER_PROFILE_DIR}/")
     logger.info("Bot is now running. Press Ctrl+C to stop gracefully.")
     logger.info("="*60)
 
     consecutive_errors = 0
     max_consecutive_errors = 5
+    cycle_number = 0
     
     while not shutdown_requested:
         try:
             update_heartbeat(status="active")
-            history = fetch_market_data()
-            
-            if history:
-                # Store price history for caching
-                store_price_history(supabase, history)
-                
-                # Run strategy models
-                lower, upper = run_strategy(history)
-                
-                if lower is not None and upper is not None:
-                    if check_profitability(lower, upper):
-                        # Execute rebalance
-                        receipt = rebalance(lower, upper, supabase)
-                        
-                        if receipt:
-                            # Calculate and store APY
-                            vault_contract = w3.eth.contract(address=VAULT_ADDRESS, abi=VAULT_ABI)
-                            apy, tvl = calculate_apy(vault_contract, history)
-                            store_apy_history(supabase, apy, tvl)
-                            
-                            update_heartbeat(status="active", metadata={
-                                "action": "rebalance",
-                                "range": [lower, upper],
-                                "apy": apy,
-                                "tvl": tvl
-                            })
-                            consecutive_errors = 0  # Reset error counter on success
+            cycle_number += 1
+            cycle_id = f"{cycle_number:06d}-{clock.utcnow():%Y%m%dT%H%M%S}"
+            if profiler.run(cycle_id, run_cycle, telemetry, update_heartbeat):
+                consecutive_errors = 0  # Reset error counter on success
             
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received")
@@ -391,7 +577,7 @@ def main():
             # Exponential backoff on errors
             error_sleep = min(60 * (2 ** (consecutive_errors - 1)), 600)  # Max 10 minutes
             logger.info(f"Waiting {error_sleep} seconds before retry...")
-            time.sleep(error_sleep)
+            clock.sleep(error_sleep)
             continue
         
         if not shutdown_requested:
@@ -400,12 +586,15 @@ def main():
             for _ in range(360):  # 360 * 10 = 3600 seconds = 1 hour
                 if shutdown_requested:
                     break
-                time.sleep(10)
+                clock.sleep(10)
     
     # Graceful shutdown
     logger.info("="*60)
     logger.info("Shutting down gracefully...")
+    logger.info(f"Forecast cache stats: {get_default_cache().stats}")
     update_heartbeat(status="stopped", metadata={"reason": "graceful_shutdown"})
+    if telemetry:
+        telemetry.close()
     logger.info("Bot stopped successfully")
     logger.info("="*60)
 
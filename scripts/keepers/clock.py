@@ -0,0 +1,36 @@
+"""
+Clock used by the keeper for sleeping and timestamps.
+
+The bot reads time only through a clock object so replay and load tests can
+substitute a simulated clock and run many cycles without wall-clock waits.
+"""
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Wall-clock time."""
+
+    def utcnow(self):
+        return datetime.utcnow()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """
+    Clock whose time only advances when sleep() is called.
+
+    Args:
+        start: Initial simulated UTC datetime
+    """
+
+    def __init__(self, start):
+        self.now = start
+
+    def utcnow(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
@@ -0,0 +1,279 @@
+"""
+On-chain price ingestion from Uniswap V3 pools.
+
+Builds OHLC candles from pool Swap logs pulled in bulk block ranges, and
+reads TWAP series from the pool's observe() oracle in a single call. Either
+output can be passed straight to predict_next_range and get_hedge_ratio.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+# Swap(address indexed sender, address indexed recipient, int256 amount0,
+#      int256 amount1, uint160 sqrtPriceX96, uint128 liquidity, int24 tick)
+SWAP_EVENT_TOPIC = Web3.keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)")
+
+Q96 = 2 ** 96
+
+# IUniswapV3Pool minimal ABI for oracle reads
+POOL_ABI = [
+    {
+        "inputs": [{"internalType": "uint32[]", "name": "secondsAgos", "type": "uint32[]"}],
+        "name": "observe",
+        "outputs": [
+            {"internalType": "int56[]", "name": "tickCumulatives", "type": "int56[]"},
+            {"internalType": "uint160[]", "name": "secondsPerLiquidityCumulativeX128s", "type": "uint160[]"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+def sqrt_price_to_price(sqrt_price_x96, decimals0=18, decimals1=18, invert=False):
+    """
+    Converts sqrtPriceX96 values to human prices of token0 in token1.
+
+    Args:
+        sqrt_price_x96: Scalar or array of Q64.96 square-root prices
+        decimals0: token0 decimals
+        decimals1: token1 decimals
+        invert: Return token1 priced in token0 instead (e.g. USD per ETH
+            for a USDC/WETH pool)
+
+    Returns:
+        np.ndarray: Prices as float64
+    """
+    ratio = np.asarray(sqrt_price_x96, dtype=np.float64) / Q96
+    price = ratio * ratio * 10.0 ** (decimals0 - decimals1)
+    return 1.0 / price if invert else price
+
+
+def tick_to_price(tick, decimals0=18, decimals1=18, invert=False):
+    """Converts (possibly fractional) pool ticks to human prices."""
+    price = np.power(1.0001, np.asarray(tick, dtype=np.float64)) * 10.0 ** (decimals0 - decimals1)
+    return 1.0 / price if invert else price
+
+
+def _decode_swap_log(log):
+    data = bytes(log["data"])
+    # amount0, amount1, sqrtPriceX96, liquidity, tick (each one 32-byte word)
+    sqrt_price_x96 = int.from_bytes(data[64:96], "big")
+    tick = int.from_bytes(data[128:160], "big", signed=True)
+    return log["blockNumber"], log["logIndex"], sqrt_price_x96, tick
+
+
+def _get_logs_adaptive(w3, pool_address, from_block, to_block):
+    """Fetches logs for a range, bisecting it if the provider rejects it."""
+    try:
+        return w3.eth.get_logs({
+            "address": pool_address,
+            "topics": [SWAP_EVENT_TOPIC],
+            "fromBlock": from_block,
+            "toBlock": to_block
+        })
+    except Exception as e:
+        if from_block >= to_block:
+            raise
+        mid = (from_block + to_block) // 2
+        logger.warning(f"get_logs [{from_block}, {to_block}] failed ({e}). Splitting range.")
+        return (
+            _get_logs_adaptive(w3, pool_address, from_block, mid)
+            + _get_logs_adaptive(w3, pool_address, mid + 1, to_block)
+        )
+
+
+def fetch_swaps(w3, pool_address, from_block, to_block, chunk_size=2000):
+    """
+    Pulls Swap logs for a pool in bulk block ranges.
+
+    Block timestamps are read once per chunk boundary and interpolated for
+    the blocks in between, so a chunk costs three RPC calls regardless of
+    how many swaps it contains.
+
+    Args:
+        w3: Web3 instance
+        pool_address: Uniswap V3 pool address
+        from_block: First block (inclusive)
+        to_block: Last block (inclusive)
+        chunk_size: Blocks per eth_getLogs request
+
+    Returns:
+        pd.DataFrame: block_number, log_index, timestamp, sqrt_price_x96, tick
+            ordered by (block_number, log_index)
+    """
+    rows = []
+    boundary_blocks = []
+    boundary_times = []
+
+    for start in range(from_block, to_block + 1, chunk_size):
+        end = min(start + chunk_size - 1, to_block)
+        logs = _get_logs_adaptive(w3, pool_address, start, end)
+        rows.extend(_decode_swap_log(log) for log in logs)
+
+        for block in (start, end):
+            if not boundary_blocks or boundary_blocks[-1] != block:
+                boundary_blocks.append(block)
+                boundary_times.append(w3.eth.get_block(block)["timestamp"])
+
+    swaps = pd.DataFrame(rows, columns=["block_number", "log_index", "sqrt_price_x96", "tick"])
+    swaps = swaps.sort_values(["block_number", "log_index"], ignore_index=True)
+    swaps["timestamp"] = np.interp(
+        swaps["block_number"].to_numpy(dtype=np.float64),
+        np.asarray(boundary_blocks, dtype=np.float64),
+        np.asarray(boundary_times, dtype=np.float64)
+    ) if len(swaps) else np.empty(0)
+    logger.info(f"Fetched {len(swaps)} swaps over blocks {from_block}-{to_block}")
+    return swaps
+
+
+def build_candles(timestamps, prices, interval_seconds, start=None, end=None):
+    """
+    Aggregates trade prices into OHLC candles.
+
+    Intervals without trades carry the previous close forward so the output
+    is a gap-free series.
+
+    Args:
+        timestamps: Unix timestamps (seconds) of each trade
+        prices: Trade prices
+        interval_seconds: Candle width in seconds
+        start: Optional first bucket timestamp (defaults to first trade)
+        end: Optional last timestamp covered (defaults to last trade)
+
+    Returns:
+        pd.DataFrame: Indexed by bucket start timestamp with open, high,
+            low, close and swaps columns
+    """
+    columns = ["open", "high", "low", "close", "swaps"]
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(timestamps) == 0:
+        return pd.DataFrame(columns=columns)
+
+    buckets = (timestamps // interval_seconds).astype(np.int64) * interval_seconds
+    grouped = pd.DataFrame({"bucket": buckets, "price": prices}).groupby("bucket", sort=True)["price"]
+    candles = pd.DataFrame({
+        "open": grouped.first(),
+        "high": grouped.max(),
+        "low": grouped.min(),
+        "close": grouped.last(),
+        "swaps": grouped.size()
+    })
+
+    first = int(candles.index[0] if start is None else (start // interval_seconds) * interval_seconds)
+    last = int(candles.index[-1] if end is None else (end // interval_seconds) * interval_seconds)
+    candles = candles.reindex(np.arange(first, last + 1, interval_seconds))
+
+    candles["close"] = candles["close"].ffill()
+    for column in ("open", "high", "low"):
+        candles[column] = candles[column].fillna(candles["close"])
+    candles["swaps"] = candles["swaps"].fillna(0).astype(np.int64)
+    candles.index.name = "timestamp"
+    # Leading buckets before the first trade have no price to carry forward
+    return candles.dropna(subset=["close"])
+
+
+def fetch_twap_prices(w3, pool_address, interval_seconds, periods,
+                      decimals0=18, decimals1=18, invert=False):
+    """
+    Reads a TWAP series from the pool oracle with a single observe() call.
+
+    Args:
+        w3: Web3 instance
+        pool_address: Uniswap V3 pool address
+        interval_seconds: Averaging window for each TWAP point
+        periods: Number of TWAP points to return (oldest first)
+
+    Returns:
+        list: TWAP prices, one per interval, ending at the latest block
+
+    Raises:
+        ValueError: If the pool's observation history is too short
+    """
+    pool = w3.eth.contract(address=pool_address, abi=POOL_ABI)
+    seconds_agos = [interval_seconds * i for i in range(periods, -1, -1)]
+    try:
+        tick_cumulatives, _ = pool.functions.observe(seconds_agos).call()
+    except Exception as e:
+        raise ValueError(
+            f"observe() failed for {periods} x {interval_seconds}s. "
+            f"Pool observation cardinality may be too low: {e}"
+        ) from e
+
+    average_ticks = np.diff(np.asarray(tick_cumulatives, dtype=np.float64)) / interval_seconds
+    return tick_to_price(average_ticks, decimals0, decimals1, invert).tolist()
+
+
+class OnchainPriceFeed:
+    """
+    Price history source backed by a single Uniswap V3 pool.
+
+    Args:
+        w3: Web3 instance
+        pool_address: Uniswap V3 pool address
+        decimals0: token0 decimals
+        decimals1: token1 decimals
+        invert: Quote token1 in token0 (e.g. USD per ETH for USDC/WETH)
+        interval_seconds: Candle / TWAP interval
+        chunk_size: Blocks per eth_getLogs request
+    """
+
+    def __init__(self, w3, pool_address, decimals0=18, decimals1=18, invert=False,
+                 interval_seconds=3600, chunk_size=2000):
+        self.w3 = w3
+        self.pool_address = Web3.to_checksum_address(pool_address)
+        self.decimals0 = decimals0
+        self.decimals1 = decimals1
+        self.invert = invert
+        self.interval_seconds = interval_seconds
+        self.chunk_size = chunk_size
+
+    def fetch_candles(self, from_block, to_block):
+        """Returns OHLC candles built from Swap logs in [from_block, to_block]."""
+        swaps = fetch_swaps(self.w3, self.pool_address, from_block, to_block, self.chunk_size)
+        prices = sqrt_price_to_price(
+            swaps["sqrt_price_x96"].to_numpy(dtype=np.float64),
+            self.decimals0, self.decimals1, self.invert
+        )
+        return build_candles(swaps["timestamp"].to_numpy(), prices, self.interval_seconds)
+
+    def fetch_prices(self, lookback_blocks):
+        """Returns candle closes covering the last lookback_blocks blocks."""
+        return self.fetch_price_series(lookback_blocks)[1]
+
+    def fetch_price_series(self, lookback_blocks):
+        """
+        Returns (timestamps, closes) for completed candles covering the last
+        lookback_blocks blocks. Timestamps are candle start times (unix seconds).
+
+        The interval containing the latest block is still open; its close
+        would be stored once and never corrected, so it is left out.
+        """
+        latest = self.w3.eth.block_number
+        candles = self.fetch_candles(max(0, latest - lookback_blocks), latest)
+        latest_time = self.w3.eth.get_block(latest)["timestamp"]
+        open_bucket = (latest_time // self.interval_seconds) * self.interval_seconds
+        candles = candles[candles.index < open_bucket]
+        return [int(t) for t in candles.index], candles["close"].tolist()
+
+    def fetch_twap(self, periods):
+        """Returns the last `periods` interval TWAPs from the pool oracle."""
+        return fetch_twap_prices(
+            self.w3, self.pool_address, self.interval_seconds, periods,
+            self.decimals0, self.decimals1, self.invert
+        )
+
+    def fetch_twap_series(self, periods):
+        """
+        Returns (timestamps, prices) for the last `periods` interval TWAPs.
+        Timestamps are the start of each averaging window (unix seconds),
+        counted back from the latest block.
+        """
+        latest = int(self.w3.eth.get_block("latest")["timestamp"])
+        prices = self.fetch_twap(periods)
+        timestamps = [latest - self.interval_seconds * (periods - i) for i in range(periods)]
+        return timestamps, prices
@@ -0,0 +1,143 @@
+"""
+On-demand profiling of keeper cycles.
+
+A CycleProfiler is armed (by SIGUSR1 or at start-up) to capture the next N
+cycles. Each captured cycle writes, under the profile directory:
+
+    cycle-<id>.prof         cProfile stats (pstats / snakeviz compatible)
+    cycle-<id>.tracemalloc  tracemalloc snapshot taken at the end of the cycle
+    cycle-<id>.txt          summary: wall time, time per library (GARCH fit, pandas,
+                            RPC/HTTP waits, ...), top functions and allocations
+
+While disarmed, wrapping a cycle costs a single integer check: no profiler,
+trace hook or allocation tracing is installed.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+# Library buckets for the time breakdown, matched against "file:function"
+TIME_CATEGORIES = (
+    ("GARCH fit", ("/models/garch.py", "/arch/")),
+    ("scipy", ("/scipy/",)),
+    ("pandas", ("/pandas/",)),
+    ("numpy", ("/numpy/",)),
+    ("rpc / http", ("/web3/", "/requests/", "/urllib3/", "/http/", "/ssl.py", "/socket.py", "_socket", "_ssl")),
+    ("supabase / telemetry", ("/supabase/", "/postgrest/", "/httpx/", "/httpcore/", "sqlite3")),
+    ("models", ("/models/",)),
+    ("keeper", ("/scripts/keepers/",)),
+)
+
+
+def categorise(stats):
+    """
+    Splits a profile's own time (tottime) into library categories.
+
+    Args:
+        stats (pstats.Stats): Loaded profile.
+
+    Returns:
+        dict: Category -> seconds, including "other".
+    """
+    totals = {name: 0.0 for name, _ in TIME_CATEGORIES}
+    totals["other"] = 0.0
+    for (filename, _, function), (_, _, tottime, _, _) in stats.stats.items():
+        location = f"{filename.replace(os.sep, '/')}:{function}"
+        for name, patterns in TIME_CATEGORIES:
+            if any(pattern in location for pattern in patterns):
+                totals[name] += tottime
+                break
+        else:
+            totals["other"] += tottime
+    return totals
+
+
+class CycleProfiler:
+    """
+    Captures cProfile stats and tracemalloc snapshots for the next N cycles.
+
+    Args:
+        output_dir: Directory for profile files (created on first capture)
+        cycles: Cycles captured per request
+        top: Functions and allocation sites listed in each summary
+    """
+
+    def __init__(self, output_dir="profiles", cycles=3, top=25):
+        self.output_dir = output_dir
+        self.cycles = cycles
+        self.top = top
+        self.remaining = 0
+        self.captured = []
+
+    def request(self, cycles=None):
+        """Arms the profiler for the next `cycles` cycles (signal-handler safe)."""
+        self.remaining = max(self.remaining, cycles or self.cycles)
+
+    def handle_signal(self, signum, frame):
+        """Signal handler, e.g. for SIGUSR1."""
+        self.request()
+        logger.info(f"Received signal {signum}. Profiling the next {self.remaining} cycles...")
+
+    def run(self, cycle_id, func, *args, **kwargs):
+        """Runs one cycle, profiling it if the profiler is armed."""
+        if not self.remaining:
+            return func(*args, **kwargs)
+        return self._capture(cycle_id, func, args, kwargs)
+
+    def _capture(self, cycle_id, func, args, kwargs):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+
+        start = time.perf_counter()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self.remaining = max(self.remaining - 1, 0)
+            try:
+                self._write(cycle_id, profile, baseline, snapshot, elapsed, peak)
+            except Exception as e:
+                logger.error(f"Failed to write profile for cycle {cycle_id}: {e}")
+
+    def _write(self, cycle_id, profile, baseline, snapshot, elapsed, peak):
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"cycle-{cycle_id}")
+
+        profile.dump_stats(f"{prefix}.prof")
+        snapshot.dump(f"{prefix}.tracemalloc")
+
+        stats = pstats.Stats(profile)
+        lines = [f"Cycle {cycle_id}", f"Wall time: {elapsed:.3f}s", f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", ""]
+
+        lines.append("Time by library (own time):")
+        for name, seconds in sorted(categorise(stats).items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {name:<24} {seconds:8.3f}s")
+        lines.append("")
+
+        lines.append("Top allocations during the cycle:")
+        for diff in snapshot.compare_to(baseline, "lineno")[:self.top]:
+            lines.append(f"  {diff}")
+        lines.append("")
+
+        buffer = io.StringIO()
+        pstats.Stats(profile, stream=buffer).sort_stats("cumulative").print_stats(self.top)
+        lines.append(buffer.getvalue())
+
+        with open(f"{prefix}.txt", "w") as f:
+            f.write("\n".join(lines))
+
+        self.captured.append(prefix)
+        logger.info(f"Profile written: {prefix}.txt ({elapsed:.2f}s, {self.remaining} cycles left)")
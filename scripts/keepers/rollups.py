@@ -0,0 +1,291 @@
+"""
+Incremental dashboard rollups for Supabase telemetry.
+
+Raw price, APY and rebalance records are folded into hourly, daily and weekly
+buckets (price OHLC, APY averages, latest TVL, gas spend and rebalance
+counts) so dashboard queries read a fixed number of rows however long the
+vaults have run. New records are aggregated locally and merged server-side
+in one RPC per table (merge_price_rollups / merge_vault_rollups in
+supabase_schema.sql); `backfill` rebuilds both tables from the raw history.
+
+Usage:
+    python -m scripts.keepers.rollups backfill
+"""
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("hour", "day", "week")
+
+# Rollup table -> (primary key columns, server-side merge function)
+ROLLUP_TABLES = {
+    "price_rollups": ("symbol,bucket,bucket_start", "merge_price_rollups"),
+    "vault_rollups": ("vault_address,bucket,bucket_start", "merge_vault_rollups"),
+}
+
+# Postgres insufficient_privilege: the merge functions are granted to service_role only
+PERMISSION_DENIED = "42501"
+
+
+def is_permission_error(error):
+    """True if Supabase refused a request for lack of privileges (e.g. an anon key)."""
+    code = str(getattr(error, "code", "") or "")
+    return code == PERMISSION_DENIED or "permission denied" in str(error).lower()
+
+
+def _parse_time(value):
+    """Parses a datetime or ISO-8601 string into a naive UTC datetime."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def bucket_start(timestamp, bucket):
+    """Start of the hour, day or ISO week (Monday) containing `timestamp`."""
+    timestamp = _parse_time(timestamp)
+    if bucket == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown rollup bucket: {bucket}")
+
+
+def merge_price_rollup(current, new):
+    """
+    Combines two partial OHLC rows for the same bucket.
+
+    Matches merge_price_rollups in supabase_schema.sql: the earlier open and
+    the later close win (ties go to `new`), highs and lows widen, samples add.
+    """
+    if current is None:
+        return dict(new)
+    merged = dict(current)
+    if new["open_time"] < current["open_time"]:
+        merged["open"], merged["open_time"] = new["open"], new["open_time"]
+    if new["close_time"] >= current["close_time"]:
+        merged["close"], merged["close_time"] = new["close"], new["close_time"]
+    merged["high"] = max(current["high"], new["high"])
+    merged["low"] = min(current["low"], new["low"])
+    merged["samples"] = current["samples"] + new["samples"]
+    return merged
+
+
+def merge_vault_rollup(current, new):
+    """
+    Combines two partial vault rows for the same bucket.
+
+    Matches merge_vault_rollups in supabase_schema.sql: sums and counts add,
+    the most recent TVL observation wins.
+    """
+    if current is None:
+        return dict(new)
+    merged = dict(current)
+    for column in ("apy_sum", "apy_count", "rebalance_count", "gas_used", "cost_eth"):
+        merged[column] = current[column] + new[column]
+    if new["tvl_time"] is not None and (current["tvl_time"] is None or new["tvl_time"] >= current["tvl_time"]):
+        merged["tvl_last"], merged["tvl_time"] = new["tvl_last"], new["tvl_time"]
+    return merged
+
+
+def _accumulate(rollups, key, row, merge):
+    rollups[key] = merge(rollups.get(key), row)
+
+
+def aggregate_prices(records, buckets=BUCKETS, rollups=None):
+    """
+    Folds price_history records into OHLC rows.
+
+    Args:
+        records: Iterable of price_history records (timestamp, symbol, price_usd)
+        buckets: Bucket sizes to maintain
+        rollups: Existing aggregate to merge into (a new dict if omitted)
+
+    Returns:
+        dict: (symbol, bucket, bucket_start) -> rollup row
+    """
+    rollups = {} if rollups is None else rollups
+    for record in records:
+        timestamp = _parse_time(record["timestamp"])
+        price = float(record["price_usd"])
+        for bucket in buckets:
+            start = bucket_start(timestamp, bucket)
+            row = {
+                "symbol": record["symbol"], "bucket": bucket, "bucket_start": start,
+                "open": price, "high": price, "low": price, "close": price,
+                "open_time": timestamp, "close_time": timestamp, "samples": 1
+            }
+            _accumulate(rollups, (record["symbol"], bucket, start), row, merge_price_rollup)
+    return rollups
+
+
+def aggregate_vaults(apy_records=(), rebalance_records=(), buckets=BUCKETS, rollups=None):
+    """
+    Folds apy_history and rebalance_events records into per-vault rows.
+
+    Args:
+        apy_records: apy_history records (timestamp, vault_address, apy, tvl)
+        rebalance_records: rebalance_events records (timestamp, vault_address, gas_used, cost_eth)
+        buckets: Bucket sizes to maintain
+        rollups: Existing aggregate to merge into (a new dict if omitted)
+
+    Returns:
+        dict: (vault_address, bucket, bucket_start) -> rollup row
+    """
+    rollups = {} if rollups is None else rollups
+
+    def add(record, **values):
+        timestamp = _parse_time(record["timestamp"])
+        vault = (record.get("vault_address") or "").lower()
+        for bucket in buckets:
+            start = bucket_start(timestamp, bucket)
+            row = {
+                "vault_address": vault, "bucket": bucket, "bucket_start": start,
+                "apy_sum": 0.0, "apy_count": 0, "tvl_last": None, "tvl_time": None,
+                "rebalance_count": 0, "gas_used": 0, "cost_eth": 0.0
+            }
+            row.update(values)
+            if row["tvl_last"] is not None:
+                row["tvl_time"] = timestamp
+            _accumulate(rollups, (vault, bucket, start), row, merge_vault_rollup)
+
+    for record in apy_records:
+        add(record, apy_sum=float(record["apy"]), apy_count=1, tvl_last=float(record["tvl"]))
+    for record in rebalance_records:
+        add(
+            record, rebalance_count=1,
+            gas_used=int(record.get("gas_used") or 0), cost_eth=float(record.get("cost_eth") or 0)
+        )
+    return rollups
+
+
+def to_rows(rollups):
+    """Serialises aggregated rollups into JSON rows for Supabase."""
+    rows = []
+    for row in rollups.values():
+        row = dict(row)
+        for column in ("bucket_start", "open_time", "close_time", "tvl_time"):
+            if isinstance(row.get(column), datetime):
+                row[column] = row[column].isoformat()
+        rows.append(row)
+    return rows
+
+
+class RollupWriter:
+    """
+    Merges rollup deltas for newly stored telemetry, one RPC per table.
+
+    Designed as TelemetrySpool's on_flushed callback: it receives the records
+    Supabase actually inserted, so re-spooled duplicates are not counted twice.
+    If a merge is refused for lack of privileges the writer logs an error and
+    disables itself rather than failing every flush; run `backfill` with the
+    service key once the configuration is fixed.
+
+    Args:
+        client: Supabase client (anything exposing rpc().execute())
+        buckets: Bucket sizes to maintain
+    """
+
+    def __init__(self, client, buckets=BUCKETS):
+        self.client = client
+        self.buckets = buckets
+        self.enabled = True
+
+    def __call__(self, table, records):
+        if not records or not self.enabled:
+            return
+        if table == "price_history":
+            self._merge("price_rollups", aggregate_prices(records, self.buckets))
+        elif table == "apy_history":
+            self._merge("vault_rollups", aggregate_vaults(apy_records=records, buckets=self.buckets))
+        elif table == "rebalance_events":
+            self._merge("vault_rollups", aggregate_vaults(rebalance_records=records, buckets=self.buckets))
+
+    def _merge(self, rollup_table, rollups):
+        _, function = ROLLUP_TABLES[rollup_table]
+        try:
+            self.client.rpc(function, {"rows": to_rows(rollups)}).execute()
+        except Exception as e:
+            if not is_permission_error(e):
+                raise
+            self.enabled = False
+            logger.error(
+                f"Rollups disabled: Supabase refused {function} ({e}). The merge functions "
+                "require the service role; set SUPABASE_SERVICE_KEY or TELEMETRY_ROLLUPS=false"
+            )
+
+
+def _iter_table(client, table, columns, page_size):
+    start = 0
+    while True:
+        page = client.table(table).select(columns).order("id").range(start, start + page_size - 1).execute().data
+        yield from page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+def backfill(client, page_size=1000, buckets=BUCKETS):
+    """
+    Rebuilds both rollup tables from the raw history.
+
+    Raw tables are paged through, so memory grows with the number of buckets
+    rather than the number of records. Pause the keeper while this runs; a
+    merge landing between the delete and the rewrite would be lost.
+
+    Returns:
+        dict: Rows written per rollup table
+    """
+    prices = aggregate_prices(
+        _iter_table(client, "price_history", "timestamp,symbol,price_usd", page_size), buckets
+    )
+    vaults = aggregate_vaults(
+        _iter_table(client, "apy_history", "timestamp,vault_address,apy,tvl", page_size),
+        _iter_table(client, "rebalance_events", "timestamp,vault_address,gas_used,cost_eth", page_size),
+        buckets
+    )
+
+    written = {}
+    for rollup_table, rollups in (("price_rollups", prices), ("vault_rollups", vaults)):
+        key_columns, _ = ROLLUP_TABLES[rollup_table]
+        client.table(rollup_table).delete().in_("bucket", list(BUCKETS)).execute()
+        rows = to_rows(rollups)
+        for start in range(0, len(rows), page_size):
+            client.table(rollup_table).upsert(rows[start:start + page_size], on_conflict=key_columns).execute()
+        written[rollup_table] = len(rows)
+        logger.info(f"Rebuilt {rollup_table}: {len(rows)} rows")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain dashboard rollup tables in Supabase.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subcommands.add_parser("backfill", help="Rebuild rollups from the raw tables")
+    backfill_parser.add_argument("--page-size", type=int, default=1000, help="Rows per Supabase request")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+    if not (url and key):
+        parser.error("SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_KEY) must be set")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    written = backfill(create_client(url, key), page_size=args.page_size)
+    print(", ".join(f"{table}: {count} rows" for table, count in written.items()))
+
+
+if __name__ == "__main__":
+    main()
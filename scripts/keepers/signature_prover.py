@@ -4,54 +4,190 @@ Signature-based proof generator for ZkVerifier
 Generates ECDSA signatures for tick range predictions
 """
 import os
+from concurrent.futures import ProcessPoolExecutor, Future
+from functools import lru_cache
 from eth_account import Account
-from eth_account.messages import encode_defunct
-from web3 import Web3
+from eth_hash.auto import keccak
+from eth_keys import keys
+
+# EIP-191 prefix applied by MessageHashUtils.toEthSignedMessageHash(bytes32)
+ETH_SIGNED_MESSAGE_PREFIX = b"\x19Ethereum Signed Message:\n32"
+
+
+def encode_rebalance_payload(tick_lower: int, tick_upper: int, block_number: int) -> bytes:
+    """
+    Packs a rebalance request exactly like abi.encodePacked(int24, int24, uint256).
+
+    Args:
+        tick_lower: Lower tick boundary
+        tick_upper: Upper tick boundary
+        block_number: Block number the proof is valid for
+
+    Returns:
+        bytes: 38-byte packed payload (3 + 3 + 32)
+    """
+    try:
+        return (
+            int(tick_lower).to_bytes(3, "big", signed=True)
+            + int(tick_upper).to_bytes(3, "big", signed=True)
+            + int(block_number).to_bytes(32, "big")
+        )
+    except OverflowError as e:
+        raise ValueError(
+            f"Rebalance payload out of range ({tick_lower}, {tick_upper}, {block_number}): {e}"
+        ) from e
+
+
+class RebalanceSigner:
+    """
+    Signs rebalance payloads for ZkVerifier with a key that is parsed once.
+
+    Produces the same 65-byte (r, s, v) signature as
+    Account.sign_message(encode_defunct(hexstr=solidity_keccak(...).hex())).
+    """
+
+    def __init__(self, private_key: str):
+        account = Account.from_key(private_key)
+        self.address = account.address
+        self._key = keys.PrivateKey(bytes(account.key))
+
+    def message_hash(self, tick_lower: int, tick_upper: int, block_number: int) -> bytes:
+        """Returns keccak256(abi.encodePacked(tickLower, tickUpper, blockNumber))."""
+        return keccak(encode_rebalance_payload(tick_lower, tick_upper, block_number))
+
+    def sign(self, tick_lower: int, tick_upper: int, block_number: int) -> bytes:
+        """
+        Signs a single (tickLower, tickUpper, blockNumber) request.
+
+        Returns:
+            bytes: ECDSA signature that can be verified on-chain
+        """
+        message_hash = self.message_hash(tick_lower, tick_upper, block_number)
+        digest = keccak(ETH_SIGNED_MESSAGE_PREFIX + message_hash)
+        signature = self._key.sign_msg_hash(digest)
+        return (
+            signature.r.to_bytes(32, "big")
+            + signature.s.to_bytes(32, "big")
+            + bytes([signature.v + 27])
+        )
+
+    def sign_batch(self, requests) -> list:
+        """
+        Signs many rebalance requests, e.g. one per vault.
+
+        Args:
+            requests: Iterable of (tick_lower, tick_upper, block_number) tuples
+
+        Returns:
+            list: Signatures in the same order as the requests
+        """
+        return [self.sign(*request) for request in requests]
+
+
+# Signer held by each worker process of a SigningService
+_worker_signer = None
+
+
+def _init_worker(private_key: str):
+    global _worker_signer
+    _worker_signer = RebalanceSigner(private_key)
+
+
+def _sign_batch_in_worker(requests) -> list:
+    return _worker_signer.sign_batch(requests)
+
+
+class SigningService:
+    """
+    Batched signing front-end that can run signing off the keeper loop.
+
+    With use_process=True the key is loaded once in a dedicated worker process
+    and submit() returns immediately with a Future. Otherwise batches are
+    signed inline and returned as an already-completed Future.
+    """
+
+    def __init__(self, private_key: str, use_process: bool = False):
+        self._signer = RebalanceSigner(private_key)
+        self.address = self._signer.address
+        self._executor = None
+        if use_process:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, initializer=_init_worker, initargs=(private_key,)
+            )
+
+    def submit(self, requests) -> Future:
+        """
+        Queues a batch of (tick_lower, tick_upper, block_number) requests.
+
+        Returns:
+            Future: Resolves to the list of signatures for the batch
+        """
+        requests = [tuple(request) for request in requests]
+        if self._executor is not None:
+            return self._executor.submit(_sign_batch_in_worker, requests)
+
+        future = Future()
+        try:
+            future.set_result(self._signer.sign_batch(requests))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def sign_batch(self, requests) -> list:
+        """Signs a batch and waits for the result."""
+        return self.submit(requests).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@lru_cache(maxsize=8)
+def get_signer(private_key: str) -> RebalanceSigner:
+    """Returns a cached RebalanceSigner so each key is parsed only once."""
+    return RebalanceSigner(private_key)
+
 
 def generate_signature_proof(tick_lower: int, tick_upper: int, block_number: int, private_key: str) -> bytes:
     """
     Generate ECDSA signature for tick range prediction
-    
+
     Args:
         tick_lower: Lower tick boundary
-        tick_upper: Upper tick boundary  
+        tick_upper: Upper tick boundary
         block_number: Current block number for freshness
         private_key: Keeper's private key (0x...)
-        
+
     Returns:
         bytes: ECDSA signature that can be verified on-chain
     """
-    # Create message hash matching contract logic
-    # abi.encodePacked(tickLower, tickUpper, blockNumber)
-    message_hash = Web3.solidity_keccak(
-        ['int24', 'int24', 'uint256'],
-        [tick_lower, tick_upper, block_number]
-    )
-    
-    # Sign the message
-    account = Account.from_key(private_key)
-    message = encode_defunct(hexstr=message_hash.hex())
-    signed_message = account.sign_message(message)
-    
-    return signed_message.signature
+    # Message hash matches contract logic:
+    # keccak256(abi.encodePacked(tickLower, tickUpper, blockNumber))
+    return get_signer(private_key).sign(tick_lower, tick_upper, block_number)
 
 def main():
     """Test signature generation"""
     # Example usage
     private_key = os.getenv("KEEPER_PK", "0x" + "1" * 64)  # Dummy key for testing
-    
+
     tick_lower = -1000
     tick_upper = 1000
     block_number = 12345
-    
+
     signature = generate_signature_proof(tick_lower, tick_upper, block_number, private_key)
-    
+
     print(f"Generated signature: 0x{signature.hex()}")
     print(f"Signature length: {len(signature)} bytes")
-    
+
     # Verify signer
-    account = Account.from_key(private_key)
-    print(f"Signer address: {account.address}")
+    print(f"Signer address: {get_signer(private_key).address}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,330 @@
+"""
+Durable write-behind spool for Supabase telemetry.
+
+Records are appended to a local SQLite database in WAL mode on the keeper's
+critical path and shipped to Supabase in bulk by a background flusher. Each
+table is upserted on its natural key so a retried batch never duplicates
+rows, and records stay in the spool until Supabase has accepted them.
+
+A record Supabase rejects outright (constraint or type errors), or one that
+keeps failing for MAX_ATTEMPTS flushes, is isolated from its batch by
+bisection and moved to a local quarantine table. The rest of the batch still
+ships; quarantined records can be requeued once the cause is fixed.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Idempotency key per table (matches the UNIQUE constraints in supabase_schema.sql)
+CONFLICT_KEYS = {
+    "price_history": "timestamp,symbol",
+    "apy_history": "timestamp,vault_address",
+    "rebalance_events": "tx_hash",
+    "bot_heartbeats": "bot_id",
+}
+
+# Tables whose latest record should overwrite the stored row; all others are
+# immutable events where a replayed record is simply ignored. price_history is
+# first-write-wins: rollups are merged from newly inserted rows only, so an
+# overwrite would leave them out of step with the raw table
+MUTABLE_TABLES = {"bot_heartbeats"}
+
+MAX_BACKOFF_SECONDS = 300
+# Failed flushes after which a batch is bisected and a lone failing record
+# quarantined, whatever the error (about four hours at the backoff cap)
+MAX_ATTEMPTS = 50
+
+# PostgreSQL error classes that retrying cannot fix: data exceptions (22),
+# integrity violations (23) and syntax / undefined column errors (42)
+PERMANENT_ERROR_CLASSES = ("22", "23", "42")
+
+
+def is_permanent_error(error):
+    """True if Supabase rejected the records themselves rather than being unavailable."""
+    if isinstance(error, (TypeError, ValueError)):
+        return True
+    code = str(getattr(error, "code", "") or "")
+    return code.startswith(PERMANENT_ERROR_CLASSES) or code.startswith("PGRST")
+
+
+class TelemetrySpool:
+    """
+    Local append-only spool with a background flusher to Supabase.
+
+    Args:
+        path: SQLite database file for the spool
+        client: Supabase client (anything exposing table().upsert().execute())
+        batch_size: Maximum records shipped per table per request
+        flush_interval: Seconds between background flushes
+        on_flushed: Optional callback(table, records) run after each accepted
+            batch with the records Supabase newly stored (e.g. RollupWriter)
+    """
+
+    def __init__(self, path, client, batch_size=500, flush_interval=5.0, on_flushed=None):
+        self.path = path
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flushed = on_flushed
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS spool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                record TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS quarantine (
+                id INTEGER PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                record TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                quarantined_at REAL NOT NULL
+            )
+            """
+        )
+
+    def write(self, table, record):
+        """Appends a single record for `table` to the spool."""
+        self.write_many(table, [record])
+
+    def write_many(self, table, records):
+        """Appends several records for `table` in one local transaction."""
+        if table not in CONFLICT_KEYS:
+            raise ValueError(f"Unknown telemetry table: {table}")
+
+        rows = [(table, json.dumps(record, default=str)) for record in records]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO spool (table_name, record) VALUES (?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def pending(self):
+        """Returns the number of records not yet accepted by Supabase."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def quarantined(self):
+        """Returns the number of records moved to quarantine."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0]
+
+    def requeue_quarantined(self):
+        """
+        Moves quarantined records back into the spool (e.g. after a schema fix).
+
+        Returns:
+            int: Number of records requeued
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            count = self._conn.execute(
+                "INSERT INTO spool (table_name, record) SELECT table_name, record FROM quarantine ORDER BY id"
+            ).rowcount
+            self._conn.execute("DELETE FROM quarantine")
+            self._conn.execute("COMMIT")
+        return count
+
+    def flush(self):
+        """
+        Ships every due record to Supabase, one bulk upsert per table batch.
+
+        Returns:
+            int: Number of records shipped
+        """
+        shipped = 0
+        with self._flush_lock:
+            for table in CONFLICT_KEYS:
+                if table in MUTABLE_TABLES:
+                    self._collapse(table)
+                while True:
+                    batch = self._next_batch(table)
+                    if not batch:
+                        break
+                    ids = [row_id for row_id, _, _ in batch]
+                    try:
+                        stored = self._ship(table, [record for _, record, _ in batch])
+                    except Exception as e:
+                        logger.warning(f"Telemetry flush of {len(ids)} {table} records failed: {e}")
+                        if not self._isolating(batch, e):
+                            self._defer(ids)
+                            break
+                        accepted, complete = self._bisect(table, batch, e)
+                        shipped += accepted
+                        if not complete:
+                            break
+                        continue
+                    self._delete(ids)
+                    shipped += len(ids)
+                    self._notify(table, stored)
+        return shipped
+
+    def _isolating(self, batch, error):
+        return is_permanent_error(error) or max(attempts for _, _, attempts in batch) + 1 >= MAX_ATTEMPTS
+
+    def _bisect(self, table, batch, error):
+        """
+        Ships the halves of a failed batch separately until the failing records
+        are isolated, then quarantines them.
+
+        Returns:
+            tuple: (records shipped, False if a transient failure deferred the rest)
+        """
+        if len(batch) == 1:
+            self._quarantine(batch[0], error)
+            return 0, True
+
+        shipped = 0
+        middle = len(batch) // 2
+        halves = [batch[:middle], batch[middle:]]
+        for i, half in enumerate(halves):
+            ids = [row_id for row_id, _, _ in half]
+            try:
+                stored = self._ship(table, [record for _, record, _ in half])
+            except Exception as e:
+                if not self._isolating(half, e):
+                    # Supabase is unavailable rather than rejecting the records
+                    self._defer([row_id for rest in halves[i:] for row_id, _, _ in rest])
+                    return shipped, False
+                accepted, complete = self._bisect(table, half, e)
+                shipped += accepted
+                if not complete:
+                    self._defer([row_id for rest in halves[i + 1:] for row_id, _, _ in rest])
+                    return shipped, False
+                continue
+            self._delete(ids)
+            shipped += len(ids)
+            self._notify(table, stored)
+        return shipped, True
+
+    def _quarantine(self, row, error):
+        row_id, record, attempts = row
+        logger.error(f"Quarantining telemetry record {row_id} after {attempts + 1} attempts: {error}")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO quarantine (id, table_name, record, attempts, error, quarantined_at) "
+                "SELECT id, table_name, record, attempts + 1, ?, ? FROM spool WHERE id = ?",
+                (str(error), time.time(), row_id)
+            )
+            self._conn.execute("DELETE FROM spool WHERE id = ?", (row_id,))
+            self._conn.execute("COMMIT")
+
+    def _notify(self, table, stored):
+        if self.on_flushed is None:
+            return
+        try:
+            self.on_flushed(table, stored)
+        except Exception as e:
+            # The raw rows are safe in Supabase; a rollup backfill repairs the gap
+            logger.warning(f"on_flushed callback failed for {len(stored)} {table} records: {e}")
+
+    def _collapse(self, table):
+        """
+        Drops pending records of a mutable table that a newer record (by
+        spool id) supersedes. Otherwise a deferred old row could be shipped
+        after a newer one and overwrite it with stale state.
+        """
+        key_columns = CONFLICT_KEYS[table].split(",")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, record FROM spool WHERE table_name = ? ORDER BY id", (table,)
+            ).fetchall()
+            newest = {}
+            for row_id, record in rows:
+                record = json.loads(record)
+                newest[tuple(record.get(column) for column in key_columns)] = row_id
+            keep = set(newest.values())
+            stale = [row_id for row_id, _ in rows if row_id not in keep]
+            if stale:
+                placeholders = ",".join("?" * len(stale))
+                self._conn.execute(f"DELETE FROM spool WHERE id IN ({placeholders})", stale)
+
+    def _next_batch(self, table):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, record, attempts FROM spool WHERE table_name = ? AND next_attempt <= ? "
+                "ORDER BY id LIMIT ?",
+                (table, time.time(), self.batch_size)
+            ).fetchall()
+        return [(row_id, json.loads(record), attempts) for row_id, record, attempts in rows]
+
+    def _ship(self, table, records):
+        # Postgres rejects an upsert that touches the same key twice, so keep
+        # only the latest record per idempotency key within the batch
+        key_columns = CONFLICT_KEYS[table].split(",")
+        latest = {}
+        for record in records:
+            latest[tuple(record.get(column) for column in key_columns)] = record
+
+        records = list(latest.values())
+        response = self.client.table(table).upsert(
+            records,
+            on_conflict=CONFLICT_KEYS[table],
+            ignore_duplicates=table not in MUTABLE_TABLES
+        ).execute()
+
+        # With ignore_duplicates the returned representation holds only the
+        # rows that were actually inserted
+        stored = getattr(response, "data", None)
+        return stored if isinstance(stored, list) else records
+
+    def _defer(self, ids):
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE spool SET attempts = attempts + 1, "
+                f"next_attempt = ? + MIN(?, (1 << MIN(attempts, 16))) WHERE id IN ({placeholders})",
+                (time.time(), MAX_BACKOFF_SECONDS, *ids)
+            )
+
+    def _delete(self, ids):
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            self._conn.execute(f"DELETE FROM spool WHERE id IN ({placeholders})", ids)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Telemetry flusher error: {e}")
+
+    def start(self):
+        """Starts the background flusher thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stops the flusher and makes a final attempt to ship pending records."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        remaining = self.pending()
+        if remaining:
+            logger.warning(f"{remaining} telemetry records remain spooled in {self.path}")
+        self._conn.close()
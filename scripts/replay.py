@@ -0,0 +1,470 @@
+"""
+Accelerated-clock replay harness for end-to-end keeper load testing.
+
+Runs the real keeper loop (scripts/keepers/bot.main) against:
+  - a simulated clock, so each hourly sleep completes instantly
+  - a local CoinGecko-compatible stub serving recorded or synthetic prices
+  - an Anvil chain with N CoreVaults deployed by contracts/script/DeployReplay.s.sol
+  - an in-memory Supabase stand-in behind the keeper's telemetry spool
+
+It then reports cycle latency, RPC calls per cycle, transactions sent and
+gas used. Use it to size keeper hardware and RPC quotas.
+
+Usage:
+    python scripts/replay.py --vaults 5 --days 90
+    python scripts/replay.py --vaults 10 --days 180 --prices eth_daily.csv --report report.json
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+from eth_account import Account
+from web3 import Web3
+
+# Add project root to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from scripts.keepers.clock import SimulatedClock
+
+# Anvil's default dev accounts: #0 deploys, #1 runs the keeper
+DEPLOYER_PK = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+KEEPER_PK = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+
+HISTORY_DAYS = 120
+
+
+class ReplayClock(SimulatedClock):
+    """Simulated clock that calls on_finished once it reaches `end`."""
+
+    def __init__(self, start, end, on_finished):
+        super().__init__(start)
+        self.end = end
+        self.on_finished = on_finished
+
+    def sleep(self, seconds):
+        super().sleep(seconds)
+        if self.now >= self.end:
+            self.on_finished()
+
+
+def synthetic_prices(start, end, seed=7, initial_price=2000.0, annual_vol=0.8):
+    """
+    Generates daily GBM closes from `start` to `end` (inclusive).
+
+    Returns:
+        list: (datetime, price) tuples at midnight UTC
+    """
+    first = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    days = (end - first).days + 1
+    rng = np.random.default_rng(seed)
+    daily_vol = annual_vol / np.sqrt(365)
+    log_returns = rng.normal(-0.5 * daily_vol ** 2, daily_vol, days - 1)
+    prices = initial_price * np.exp(np.concatenate([[0.0], np.cumsum(log_returns)]))
+    return [(first + timedelta(days=i), float(p)) for i, p in enumerate(prices)]
+
+
+def load_prices(path):
+    """
+    Loads recorded prices from a CSV with `timestamp` and `price` columns.
+
+    Timestamps may be unix seconds, unix milliseconds or ISO-8601 strings.
+    """
+    prices = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            raw = row["timestamp"]
+            try:
+                value = float(raw)
+                timestamp = datetime.utcfromtimestamp(value / 1000 if value > 1e11 else value)
+            except ValueError:
+                timestamp = datetime.fromisoformat(raw.replace("Z", ""))
+            prices.append((timestamp, float(row["price"])))
+    return sorted(prices)
+
+
+class PriceFeedStub:
+    """
+    CoinGecko market_chart stub that only reveals prices up to clock time.
+
+    Args:
+        prices: (datetime, price) tuples
+        clock: Clock providing utcnow()
+    """
+
+    def __init__(self, prices, clock):
+        self.timestamps = np.array([p[0].timestamp() for p in prices])
+        self.prices = [p[1] for p in prices]
+        self.clock = clock
+        self.requests = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                query = parse_qs(urlparse(self.path).query)
+                body = json.dumps(stub.market_chart(int(query.get("days", ["90"])[0]))).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def market_chart(self, days):
+        now = self.clock.utcnow().timestamp()
+        lo = np.searchsorted(self.timestamps, now - days * 86400, side="right")
+        hi = np.searchsorted(self.timestamps, now, side="right")
+        return {"prices": [[int(self.timestamps[i] * 1000), self.prices[i]] for i in range(lo, hi)]}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase client's table().upsert().execute() chain."""
+
+    def __init__(self):
+        self.tables = {}
+        self.rpc_calls = Counter()
+        self.requests = 0
+
+    def table(self, name):
+        return _FakeTable(self, name)
+
+    def rpc(self, function, params):
+        return _FakeRpc(self, function)
+
+
+class _FakeRpc:
+    def __init__(self, db, function):
+        self.db = db
+        self.function = function
+        self.data = None
+
+    def execute(self):
+        self.db.requests += 1
+        self.db.rpc_calls[self.function] += 1
+        return self
+
+
+class _FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def upsert(self, rows, on_conflict="", ignore_duplicates=False, **kwargs):
+        return _FakeUpsert(self.db, self.name, rows, on_conflict, ignore_duplicates)
+
+    def insert(self, rows, **kwargs):
+        return _FakeUpsert(self.db, self.name, rows, "", False)
+
+
+class _FakeUpsert:
+    def __init__(self, db, name, rows, on_conflict, ignore_duplicates):
+        self.db = db
+        self.name = name
+        self.rows = rows if isinstance(rows, list) else [rows]
+        self.key_columns = [c for c in on_conflict.split(",") if c]
+        self.ignore_duplicates = ignore_duplicates
+        self.data = []
+
+    def execute(self):
+        self.db.requests += 1
+        table = self.db.tables.setdefault(self.name, {})
+        for row in self.rows:
+            key = tuple(row.get(c) for c in self.key_columns) if self.key_columns else len(table)
+            if key in table and self.ignore_duplicates:
+                continue
+            table[key] = row
+            self.data.append(row)
+        return self
+
+
+class CountingHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that counts JSON-RPC requests by method."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = Counter()
+
+    def make_request(self, method, params):
+        self.calls[method] += 1
+        return super().make_request(method, params)
+
+
+def _wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=1):
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"Anvil did not start on port {port}")
+
+
+def start_anvil(port=8545):
+    """Starts a local Anvil node and waits until it accepts connections."""
+    process = subprocess.Popen(
+        ["anvil", "--port", str(port), "--silent"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    _wait_for_port(port)
+    return process
+
+
+def deploy_vaults(rpc_url, vault_count):
+    """
+    Deploys funded vaults with contracts/script/DeployReplay.s.sol.
+
+    Returns:
+        list: Checksummed CoreVault addresses
+    """
+    keeper_address = Account.from_key(KEEPER_PK).address
+    env = dict(
+        os.environ,
+        PRIVATE_KEY=DEPLOYER_PK,
+        KEEPER_ADDRESS=keeper_address,
+        REPLAY_VAULTS=str(vault_count)
+    )
+    subprocess.run(
+        ["forge", "script", "contracts/script/DeployReplay.s.sol:DeployReplayScript",
+         "--rpc-url", rpc_url, "--broadcast"],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+
+    chain_id = Web3(Web3.HTTPProvider(rpc_url)).eth.chain_id
+    broadcast = os.path.join(ROOT, "broadcast", "DeployReplay.s.sol", str(chain_id), "run-latest.json")
+    with open(broadcast) as f:
+        transactions = json.load(f)["transactions"]
+    return [
+        Web3.to_checksum_address(tx["contractAddress"])
+        for tx in transactions
+        if tx.get("transactionType") == "CREATE" and tx.get("contractName") == "CoreVault"
+    ]
+
+
+def _stats(values):
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max())
+    }
+
+
+def run_replay(rpc_url, vault_addresses, prices, start, end, verbose=False):
+    """
+    Drives bot.main() over [start, end) of simulated time.
+
+    Args:
+        rpc_url: Anvil JSON-RPC URL
+        vault_addresses: Vaults the keeper should manage
+        prices: (datetime, price) tuples covering HISTORY_DAYS before start
+        start: Simulated start datetime (UTC)
+        end: Simulated end datetime (UTC)
+        verbose: Show the keeper's own output
+
+    Returns:
+        dict: Load-test report
+    """
+    from scripts.keepers import bot
+
+    clock = ReplayClock(start, end, on_finished=lambda: setattr(bot, "shutdown_requested", True))
+    feed = PriceFeedStub(prices, clock).start()
+    supabase = FakeSupabase()
+    provider = CountingHTTPProvider(rpc_url)
+    spool_dir = tempfile.TemporaryDirectory()
+
+    bot.w3 = Web3(provider)
+    bot.clock = clock
+    bot.PRIVATE_KEY = KEEPER_PK
+    bot.VAULT_ADDRESS = vault_addresses[0] if vault_addresses else None
+    bot.VAULT_ADDRESSES = list(vault_addresses)
+    bot.PRICE_SOURCE = "coingecko"
+    bot.COINGECKO_API_URL = f"{feed.url}/api/v3"
+    bot.MARKET_DATA_DAYS = HISTORY_DAYS
+    bot.TELEMETRY_SPOOL_PATH = os.path.join(spool_dir.name, "telemetry.db")
+    bot.FORECAST_CACHE_DIR = os.path.join(spool_dir.name, "forecasts")
+    bot.shutdown_requested = False
+
+    cycles = []
+    receipts = []
+    # Rebalances the keeper chose to make that never reached the chain
+    # (e.g. the transaction could not be built or was rejected by the node)
+    unsent = []
+    strategy_seconds = []
+    run_cycle, rebalance, run_strategy = bot.run_cycle, bot.rebalance, bot.run_strategy
+
+    def timed_strategy(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return run_strategy(*args, **kwargs)
+        finally:
+            strategy_seconds.append(time.perf_counter() - t0)
+
+    def recorded_rebalance(*args, **kwargs):
+        sent_before = provider.calls["eth_sendRawTransaction"]
+        receipt = rebalance(*args, **kwargs)
+        if receipt:
+            receipts.append(receipt)
+        if provider.calls["eth_sendRawTransaction"] == sent_before:
+            unsent.append(clock.utcnow().isoformat())
+        return receipt
+
+    def recorded_cycle(*args, **kwargs):
+        calls_before = sum(provider.calls.values())
+        sent_before = provider.calls["eth_sendRawTransaction"]
+        receipts_before = len(receipts)
+        unsent_before = len(unsent)
+        t0 = time.perf_counter()
+        try:
+            return run_cycle(*args, **kwargs)
+        finally:
+            cycles.append({
+                "simulated_time": clock.utcnow().isoformat(),
+                "seconds": time.perf_counter() - t0,
+                "rpc_calls": sum(provider.calls.values()) - calls_before,
+                "transactions": provider.calls["eth_sendRawTransaction"] - sent_before,
+                "unsent_rebalances": len(unsent) - unsent_before,
+                "gas_used": sum(r["gasUsed"] for r in receipts[receipts_before:])
+            })
+
+    bot.run_cycle, bot.rebalance, bot.run_strategy = recorded_cycle, recorded_rebalance, timed_strategy
+    bot_level = bot.logger.level
+    if not verbose:
+        bot.logger.setLevel("WARNING")
+
+    wall_start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+            bot.main(supabase=supabase)
+    finally:
+        wall_seconds = time.perf_counter() - wall_start
+        bot.run_cycle, bot.rebalance, bot.run_strategy = run_cycle, rebalance, run_strategy
+        bot.logger.setLevel(bot_level)
+        feed.stop()
+        spool_dir.cleanup()
+
+    gas = [r["gasUsed"] for r in receipts]
+    return {
+        "vaults": len(vault_addresses),
+        "cycles": len(cycles),
+        "simulated_days": (end - start).total_seconds() / 86400,
+        "wall_seconds": wall_seconds,
+        "cycle_latency_ms": {k: v * 1000 for k, v in _stats([c["seconds"] for c in cycles]).items()},
+        "strategy_latency_ms": {k: v * 1000 for k, v in _stats(strategy_seconds).items()},
+        "rpc_calls_per_cycle": _stats([c["rpc_calls"] for c in cycles]),
+        "rpc_calls_by_method": dict(provider.calls),
+        "transactions_sent": provider.calls["eth_sendRawTransaction"],
+        "rebalances_confirmed": len(receipts),
+        "rebalances_unsent": len(unsent),
+        "gas_used_total": int(sum(gas)),
+        "gas_used_per_tx": float(np.mean(gas)) if gas else 0.0,
+        "price_feed_requests": feed.requests,
+        "supabase_requests": supabase.requests,
+        "telemetry_rows": {name: len(rows) for name, rows in supabase.tables.items()},
+        "rollup_merges": dict(supabase.rpc_calls),
+        "per_cycle": cycles
+    }
+
+
+def print_report(report):
+    print("\n--- Keeper Replay Report ---")
+    print(f"Vaults: {report['vaults']}")
+    print(f"Cycles: {report['cycles']} over {report['simulated_days']:.1f} simulated days "
+          f"in {report['wall_seconds']:.1f}s wall time")
+    latency = report["cycle_latency_ms"]
+    print(f"Cycle Latency (ms): mean {latency['mean']:.1f}, p50 {latency['p50']:.1f}, "
+          f"p95 {latency['p95']:.1f}, max {latency['max']:.1f}")
+    print(f"Strategy Latency p95 (ms): {report['strategy_latency_ms']['p95']:.1f}")
+    rpc = report["rpc_calls_per_cycle"]
+    print(f"RPC Calls / Cycle: mean {rpc['mean']:.1f}, max {rpc['max']:.0f}")
+    for method, count in sorted(report["rpc_calls_by_method"].items(), key=lambda kv: -kv[1]):
+        print(f"  {method}: {count}")
+    print(f"Transactions Sent: {report['transactions_sent']} "
+          f"({report['rebalances_confirmed']} confirmed rebalances)")
+    print(f"Gas Used: {report['gas_used_total']:,} total, {report['gas_used_per_tx']:,.0f} per rebalance")
+    if report["rebalances_unsent"]:
+        print(f"WARNING: {report['rebalances_unsent']} rebalances were attempted but sent no transaction; "
+              f"gas and transaction metrics are incomplete (run with --verbose for the keeper's errors)")
+    print(f"Supabase Requests: {report['supabase_requests']} ({report['telemetry_rows']})")
+    print(f"Rollup Merges: {report['rollup_merges']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay keeper cycles on an accelerated clock.")
+    parser.add_argument("--vaults", type=int, default=1, help="Number of vaults to deploy")
+    parser.add_argument("--days", type=float, default=30, help="Simulated days to replay")
+    parser.add_argument("--start", default="2024-01-01", help="Simulated start date (UTC)")
+    parser.add_argument("--prices", help="CSV of recorded prices (timestamp,price); synthetic if omitted")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for synthetic prices")
+    parser.add_argument("--rpc-url", help="Use an already running node instead of starting Anvil")
+    parser.add_argument("--port", type=int, default=8545, help="Port for the spawned Anvil node")
+    parser.add_argument("--report", help="Write the full JSON report to this path")
+    parser.add_argument("--verbose", action="store_true", help="Show keeper output")
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start)
+    end = start + timedelta(days=args.days)
+    if args.prices:
+        prices = load_prices(args.prices)
+    else:
+        prices = synthetic_prices(start - timedelta(days=HISTORY_DAYS + 1), end, seed=args.seed)
+
+    anvil = None
+    rpc_url = args.rpc_url
+    if not rpc_url:
+        anvil = start_anvil(args.port)
+        rpc_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        vaults = deploy_vaults(rpc_url, args.vaults)
+        print(f"Deployed {len(vaults)} vaults on {rpc_url}")
+        report = run_replay(rpc_url, vaults, prices, start, end, verbose=args.verbose)
+    finally:
+        if anvil:
+            anvil.terminate()
+            anvil.wait()
+
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+    if report["rebalances_unsent"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -56,3 +56,34 @@ export interface PriceHistory {
     metadata?: Record<string, unknown>;
     created_at: string;
 }
+
+export type RollupBucket = 'hour' | 'day' | 'week';
+
+export interface PriceRollup {
+    symbol: string;
+    bucket: RollupBucket;
+    bucket_start: string;
+    open: number;
+    high: number;
+    low: number;
+    close: number;
+    open_time: string;
+    close_time: string;
+    samples: number;
+    updated_at: string;
+}
+
+export interface VaultRollup {
+    vault_address: string;
+    bucket: RollupBucket;
+    bucket_start: string;
+    apy_sum: number;
+    apy_count: number;
+    apy_avg: number | null;
+    tvl_last: number | null;
+    tvl_time: string | null;
+    rebalance_count: number;
+    gas_used: number;
+    cost_eth: number;
+    updated_at: string;
+}
@@ -68,11 +68,105 @@ CREATE TABLE IF NOT EXISTS price_history (
 CREATE INDEX idx_price_history_timestamp ON price_history(timestamp DESC);
 CREATE INDEX idx_price_history_symbol ON price_history(symbol);
 
+-- Table: price_rollups
+-- Hourly/daily/weekly OHLC maintained incrementally by the keeper (scripts/keepers/rollups.py)
+CREATE TABLE IF NOT EXISTS price_rollups (
+    symbol TEXT NOT NULL,
+    bucket TEXT NOT NULL CHECK (bucket IN ('hour', 'day', 'week')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+    open DECIMAL(20, 6) NOT NULL,
+    high DECIMAL(20, 6) NOT NULL,
+    low DECIMAL(20, 6) NOT NULL,
+    close DECIMAL(20, 6) NOT NULL,
+    open_time TIMESTAMPTZ NOT NULL,
+    close_time TIMESTAMPTZ NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (symbol, bucket, bucket_start)
+);
+
+CREATE INDEX idx_price_rollups_bucket_start ON price_rollups(symbol, bucket, bucket_start DESC);
+
+-- Table: vault_rollups
+-- Per-vault APY averages, latest TVL, gas spend and rebalance counts per bucket
+CREATE TABLE IF NOT EXISTS vault_rollups (
+    vault_address TEXT NOT NULL,
+    bucket TEXT NOT NULL CHECK (bucket IN ('hour', 'day', 'week')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+    apy_sum DECIMAL(20, 4) NOT NULL DEFAULT 0,
+    apy_count INTEGER NOT NULL DEFAULT 0,
+    apy_avg DECIMAL(10, 4) GENERATED ALWAYS AS (apy_sum / NULLIF(apy_count, 0)) STORED,
+    tvl_last DECIMAL(20, 6),
+    tvl_time TIMESTAMPTZ,
+    rebalance_count INTEGER NOT NULL DEFAULT 0,
+    gas_used BIGINT NOT NULL DEFAULT 0,
+    cost_eth DECIMAL(30, 18) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (vault_address, bucket, bucket_start)
+);
+
+CREATE INDEX idx_vault_rollups_bucket_start ON vault_rollups(vault_address, bucket, bucket_start DESC);
+
+-- Merge a batch of partial rollups into the tables in one statement.
+-- Mirrors merge_price_rollup / merge_vault_rollup in scripts/keepers/rollups.py.
+CREATE OR REPLACE FUNCTION merge_price_rollups(rows JSONB) RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO price_rollups AS r
+        (symbol, bucket, bucket_start, open, high, low, close, open_time, close_time, samples)
+    SELECT symbol, bucket, bucket_start, open, high, low, close, open_time, close_time, samples
+    FROM jsonb_to_recordset(rows) AS x(
+        symbol TEXT, bucket TEXT, bucket_start TIMESTAMPTZ, open DECIMAL, high DECIMAL,
+        low DECIMAL, close DECIMAL, open_time TIMESTAMPTZ, close_time TIMESTAMPTZ, samples INTEGER
+    )
+    ON CONFLICT (symbol, bucket, bucket_start) DO UPDATE SET
+        open = CASE WHEN EXCLUDED.open_time < r.open_time THEN EXCLUDED.open ELSE r.open END,
+        open_time = LEAST(r.open_time, EXCLUDED.open_time),
+        close = CASE WHEN EXCLUDED.close_time >= r.close_time THEN EXCLUDED.close ELSE r.close END,
+        close_time = GREATEST(r.close_time, EXCLUDED.close_time),
+        high = GREATEST(r.high, EXCLUDED.high),
+        low = LEAST(r.low, EXCLUDED.low),
+        samples = r.samples + EXCLUDED.samples,
+        updated_at = NOW();
+$$;
+
+CREATE OR REPLACE FUNCTION merge_vault_rollups(rows JSONB) RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO vault_rollups AS r
+        (vault_address, bucket, bucket_start, apy_sum, apy_count, tvl_last, tvl_time,
+         rebalance_count, gas_used, cost_eth)
+    SELECT vault_address, bucket, bucket_start, apy_sum, apy_count, tvl_last, tvl_time,
+           rebalance_count, gas_used, cost_eth
+    FROM jsonb_to_recordset(rows) AS x(
+        vault_address TEXT, bucket TEXT, bucket_start TIMESTAMPTZ, apy_sum DECIMAL, apy_count INTEGER,
+        tvl_last DECIMAL, tvl_time TIMESTAMPTZ, rebalance_count INTEGER, gas_used BIGINT, cost_eth DECIMAL
+    )
+    ON CONFLICT (vault_address, bucket, bucket_start) DO UPDATE SET
+        apy_sum = r.apy_sum + EXCLUDED.apy_sum,
+        apy_count = r.apy_count + EXCLUDED.apy_count,
+        tvl_last = CASE
+            WHEN EXCLUDED.tvl_time IS NOT NULL AND (r.tvl_time IS NULL OR EXCLUDED.tvl_time >= r.tvl_time)
+            THEN EXCLUDED.tvl_last ELSE r.tvl_last END,
+        tvl_time = GREATEST(r.tvl_time, EXCLUDED.tvl_time),
+        rebalance_count = r.rebalance_count + EXCLUDED.rebalance_count,
+        gas_used = r.gas_used + EXCLUDED.gas_used,
+        cost_eth = r.cost_eth + EXCLUDED.cost_eth,
+        updated_at = NOW();
+$$;
+
+-- Only the keeper (service role) may merge rollups; functions are executable
+-- by PUBLIC by default, which would expose them through the anon key
+REVOKE EXECUTE ON FUNCTION merge_price_rollups(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION merge_vault_rollups(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION merge_price_rollups(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION merge_vault_rollups(JSONB) TO service_role;
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE apy_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rebalance_events ENABLE ROW LEVEL SECURITY;
 ALTER TABLE bot_heartbeats ENABLE ROW LEVEL SECURITY;
 ALTER TABLE price_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE price_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vault_rollups ENABLE ROW LEVEL SECURITY;
 
 -- Create policies for public read access
 CREATE POLICY "Allow public read access on apy_history"
@@ -91,6 +185,14 @@ CREATE POLICY "Allow public read access on price_history"
     ON price_history FOR SELECT
     USING (true);
 
+CREATE POLICY "Allow public read access on price_rollups"
+    ON price_rollups FOR SELECT
+    USING (true);
+
+CREATE POLICY "Allow public read access on vault_rollups"
+    ON vault_rollups FOR SELECT
+    USING (true);
+
 -- Create policies for service role write access
 -- Note: These policies allow writes only when using the service role key
 CREATE POLICY "Allow service role insert on apy_history"
@@ -110,6 +212,18 @@ CREATE POLICY "Allow service role insert on price_history"
     ON price_history FOR INSERT
     WITH CHECK (true);
 
+CREATE POLICY "Allow service role write on price_rollups"
+    ON price_rollups FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+CREATE POLICY "Allow service role write on vault_rollups"
+    ON vault_rollups FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
 -- Create a view for the latest APY
 CREATE OR REPLACE VIEW latest_apy AS
 SELECT DISTINCT ON (vault_address)
@@ -131,3 +245,5 @@ COMMENT ON TABLE apy_history IS 'Historical APY calculations for the vault';
 COMMENT ON TABLE rebalance_events IS 'Record of all rebalance transactions';
 COMMENT ON TABLE bot_heartbeats IS 'Bot health monitoring and status';
 COMMENT ON TABLE price_history IS 'Cached price data from external APIs';
+COMMENT ON TABLE price_rollups IS 'Hourly/daily/weekly price OHLC maintained by the keeper';
+COMMENT ON TABLE vault_rollups IS 'Hourly/daily/weekly per-vault APY, TVL, gas and rebalance aggregates';
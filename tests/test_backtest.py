@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.vamer_model import predict_next_range
+from scripts.backtest import iter_price_chunks, iter_windows, iter_samples, run_streaming_backtest
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 2000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+class TestStreamingBacktest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prices = random_walk(160)
+        self.timestamps = 1_700_000_000 + 60 * np.arange(len(self.prices))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_windows_match_in_memory_slicing(self):
+        samples = zip(range(len(self.prices)), self.prices.tolist())
+        windows = list(iter_windows(samples, window_size=100, step=7))
+
+        self.assertEqual([w[0] for w in windows], list(range(100, 159, 7)))
+        for i, window, timestamp, current, nxt in windows:
+            np.testing.assert_array_equal(window, self.prices[i - 100:i])
+            self.assertEqual((timestamp, current, nxt), (i, self.prices[i], self.prices[i + 1]))
+
+    def test_chunked_readers_agree(self):
+        np.save(self.path("prices.npy"), np.column_stack([self.timestamps, self.prices]))
+        pd.DataFrame({"timestamp": self.timestamps, "price": self.prices}).to_csv(self.path("prices.csv"), index=False)
+
+        for name in ("prices.npy", "prices.csv"):
+            chunks = list(iter_price_chunks(self.path(name), chunk_size=50))
+            self.assertEqual([len(c[1]) for c in chunks], [50, 50, 50, 10])
+            samples = list(iter_samples(chunks))
+            np.testing.assert_allclose([p for _, p in samples], self.prices)
+            self.assertEqual(samples[0][0], self.timestamps[0] * 1000)
+
+    def test_streams_results_to_csv(self):
+        np.save(self.path("prices.npy"), self.prices)
+        summary = run_streaming_backtest(
+            self.path("prices.npy"), self.path("results.csv"), window_size=100,
+            step=10, mc_paths=500, chunk_size=40, flush_rows=2
+        )
+
+        results = pd.read_csv(self.path("results.csv"))
+        self.assertEqual(summary["steps"], len(results))
+        self.assertEqual(summary["in_range"], int(results["in_range"].sum()))
+        self.assertAlmostEqual(summary["predicted_in_range_rate"], results["predicted_hit"].mean())
+
+        row = results.iloc[1]
+        tick_lower, tick_upper = predict_next_range(self.prices[110 - 100:110].tolist())
+        self.assertEqual(row["timestamp"], 110)
+        self.assertAlmostEqual(row["price_lower"], 1.0001 ** tick_lower)
+        self.assertAlmostEqual(row["price_upper"], 1.0001 ** tick_upper)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_parquet_round_trip(self):
+        pd.DataFrame({"timestamp": self.timestamps, "price": self.prices}).to_parquet(self.path("prices.parquet"))
+        run_streaming_backtest(
+            self.path("prices.parquet"), self.path("results.parquet"), window_size=100,
+            step=20, mc_paths=500, chunk_size=64, flush_rows=1
+        )
+
+        results = pd.read_parquet(self.path("results.parquet"))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results["timestamp"].iloc[0], self.timestamps[100] * 1000)
+        self.assertEqual(results["in_range"].dtype, bool)
+
+    def test_peak_memory_independent_of_history_length(self):
+        """Streaming a long memory-mapped history allocates about one chunk."""
+        prices = random_walk(1_000_000, seed=1)
+        np.save(self.path("long.npy"), prices)
+        del prices
+
+        tracemalloc.start()
+        summary = run_streaming_backtest(
+            self.path("long.npy"), self.path("long.csv"), window_size=100,
+            step=250_000, mc_paths=500, chunk_size=20_000
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(summary["steps"], 4)
+        # The history is 8 MB on disk; the stream should stay well below that
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,10 +8,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Mocking modules that might have missing dependencies (like arch)
 mock_vamer = MagicMock()
+mock_vamer.MIN_HISTORY = 100
 mock_trend = MagicMock()
 sys.modules["models"] = MagicMock()
 sys.modules["models.vamer_model"] = mock_vamer
 sys.modules["models.trend_model"] = mock_trend
+sys.modules["models.forecast_cache"] = MagicMock()
+sys.modules["models.range_simulator"] = MagicMock()
+sys.modules["models.range_optimizer"] = MagicMock()
 
 # We need to mock environment variables and imports that might run on module load
 with patch.dict(os.environ, {
@@ -62,7 +66,7 @@ class TestKeeperBot(unittest.TestCase):
         mock_predict.return_value = ((-100, 100))
         mock_get_hedge.return_value = 0.5
         
-        price_history = [100.0] * 30
+        price_history = [100.0] * 100
 
         # Call function
         lower, upper = bot.run_strategy(price_history)
@@ -100,6 +104,24 @@ class TestKeeperBot(unittest.TestCase):
             result = bot.check_profitability(-100, 100)
             self.assertFalse(result)
 
+    def test_store_price_history_uses_interval_timestamps(self):
+        # Hourly on-chain candles keep their own timestamps
+        telemetry = MagicMock()
+        start = 1_704_067_200  # 2024-01-01T00:00:00Z
+        bot.store_price_history(telemetry, [2000.0, 2001.0], [start, start + 3600])
+
+        table, records = telemetry.write_many.call_args[0]
+        self.assertEqual(table, "price_history")
+        self.assertEqual([r["timestamp"] for r in records], ["2024-01-01T00:00:00", "2024-01-01T01:00:00"])
+
+    def test_store_price_history_daily_without_timestamps(self):
+        telemetry = MagicMock()
+        with patch.object(bot.clock, "utcnow", return_value=bot.datetime(2024, 1, 31, 15, 30)):
+            bot.store_price_history(telemetry, [2000.0, 2001.0])
+
+        records = telemetry.write_many.call_args[0][1]
+        self.assertEqual([r["timestamp"] for r in records], ["2024-01-01T00:00:00", "2024-01-02T00:00:00"])
+
     @patch("scripts.keepers.bot.encode")
     def test_rebalance_transaction(self, mock_encode):
         # Mock account creation and contract
@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.keepers.onchain_prices import (
+    OnchainPriceFeed,
+    Q96,
+    build_candles,
+    fetch_swaps,
+    fetch_twap_prices,
+    sqrt_price_to_price,
+)
+
+POOL = "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8"
+
+
+def swap_log(block_number, log_index, sqrt_price_x96, tick):
+    """Encodes a Swap log's non-indexed data the way the pool emits it."""
+    data = (
+        (-1000).to_bytes(32, "big", signed=True)
+        + (2000).to_bytes(32, "big", signed=True)
+        + sqrt_price_x96.to_bytes(32, "big")
+        + (10 ** 18).to_bytes(32, "big")
+        + tick.to_bytes(32, "big", signed=True)
+    )
+    return {"blockNumber": block_number, "logIndex": log_index, "data": data}
+
+
+def make_w3(logs, seconds_per_block=12, genesis_time=1_700_000_000):
+    """Fake Web3 that serves logs by block range and linear block timestamps."""
+    w3 = MagicMock()
+
+    def get_logs(params):
+        return [log for log in logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+    w3.eth.get_logs.side_effect = get_logs
+    w3.eth.get_block.side_effect = lambda n: {"timestamp": genesis_time + n * seconds_per_block}
+    return w3
+
+
+class TestOnchainPrices(unittest.TestCase):
+
+    def test_sqrt_price_conversion(self):
+        # sqrtPriceX96 = 2 * Q96 -> raw price 4
+        self.assertAlmostEqual(float(sqrt_price_to_price(2 * Q96)), 4.0)
+        self.assertAlmostEqual(float(sqrt_price_to_price(2 * Q96, invert=True)), 0.25)
+        # USDC (6) / WETH (18): raw 4e8 wei per USDC unit -> 2500 USD per ETH
+        sqrt_price = int((4e8) ** 0.5 * Q96)
+        self.assertAlmostEqual(float(sqrt_price_to_price(sqrt_price, 6, 18, invert=True)), 2500.0, places=6)
+
+    def test_fetch_swaps_chunks_and_orders(self):
+        logs = [swap_log(b, i, Q96 + b, b) for b in range(0, 100, 7) for i in (1, 0)]
+        w3 = make_w3(logs)
+
+        swaps = fetch_swaps(w3, POOL, 0, 99, chunk_size=25)
+
+        self.assertEqual(w3.eth.get_logs.call_count, 4)
+        self.assertEqual(len(swaps), len(logs))
+        self.assertTrue(swaps["block_number"].is_monotonic_increasing)
+        self.assertEqual(swaps["tick"].iloc[-1], 98)
+        # Interpolated timestamps are exact for a constant block time
+        self.assertEqual(swaps["timestamp"].iloc[-1], 1_700_000_000 + 98 * 12)
+
+    def test_fetch_swaps_splits_rejected_range(self):
+        logs = [swap_log(b, 0, Q96, 0) for b in range(0, 40)]
+        w3 = make_w3(logs)
+        serve = w3.eth.get_logs.side_effect
+
+        def limited(params):
+            if params["toBlock"] - params["fromBlock"] >= 10:
+                raise ValueError("query returned more than 10000 results")
+            return serve(params)
+
+        w3.eth.get_logs.side_effect = limited
+        swaps = fetch_swaps(w3, POOL, 0, 39, chunk_size=40)
+        self.assertEqual(len(swaps), 40)
+
+    def test_build_candles_ohlc_and_gaps(self):
+        timestamps = [0, 10, 20, 30, 200, 210]
+        prices = [100.0, 105.0, 95.0, 101.0, 110.0, 108.0]
+
+        candles = build_candles(timestamps, prices, interval_seconds=60)
+
+        self.assertEqual(list(candles.index), [0, 60, 120, 180])
+        first = candles.loc[0]
+        self.assertEqual((first["open"], first["high"], first["low"], first["close"]), (100.0, 105.0, 95.0, 101.0))
+        # Empty intervals carry the previous close forward
+        self.assertEqual(candles.loc[60, "close"], 101.0)
+        self.assertEqual(candles.loc[120, "open"], 101.0)
+        self.assertEqual(candles.loc[120, "swaps"], 0)
+        self.assertEqual(candles.loc[180, "close"], 108.0)
+
+    def test_twap_single_observe_call(self):
+        w3 = MagicMock()
+        observe = w3.eth.contract.return_value.functions.observe
+        # Average ticks of 0 and 6932 (~2x price) over two 60s windows
+        observe.return_value.call.return_value = ([0, 0, 6932 * 60], [0, 0, 0])
+
+        prices = fetch_twap_prices(w3, POOL, interval_seconds=60, periods=2)
+
+        observe.assert_called_once_with([120, 60, 0])
+        self.assertAlmostEqual(prices[0], 1.0)
+        self.assertAlmostEqual(prices[1], 2.0, places=3)
+
+    def test_feed_prices_from_swaps(self):
+        logs = [swap_log(b, 0, 2 * Q96, 13863) for b in range(0, 1000, 50)]
+        w3 = make_w3(logs)
+        w3.eth.block_number = 999
+
+        feed = OnchainPriceFeed(w3, POOL, interval_seconds=600)
+        prices = feed.fetch_prices(lookback_blocks=999)
+
+        self.assertEqual(len(prices), 20)
+        self.assertTrue(all(abs(p - 4.0) < 1e-9 for p in prices))
+
+        timestamps, closes = feed.fetch_price_series(lookback_blocks=999)
+        self.assertEqual(closes, prices)
+        self.assertEqual(timestamps[0], 1_700_000_000 // 600 * 600)
+        self.assertEqual(timestamps[1] - timestamps[0], 600)
+
+    def test_feed_series_skips_open_interval(self):
+        # 600s candles; genesis 1_699_999_800 is bucket-aligned, 12s blocks
+        logs = [swap_log(b, 0, 2 * Q96, 13863) for b in range(0, 130, 10)]
+        w3 = make_w3(logs, genesis_time=1_699_999_800)
+        w3.eth.block_number = 125  # t = +1500s, inside the third bucket
+
+        feed = OnchainPriceFeed(w3, POOL, interval_seconds=600)
+        timestamps, closes = feed.fetch_price_series(lookback_blocks=125)
+
+        self.assertEqual(timestamps, [1_699_999_800, 1_700_000_400])
+        self.assertEqual(len(closes), 2)
+
+    def test_feed_twap_series_timestamps(self):
+        w3 = MagicMock()
+        w3.eth.get_block.return_value = {"timestamp": 1_700_000_000}
+        observe = w3.eth.contract.return_value.functions.observe
+        observe.return_value.call.return_value = ([0, 0, 0], [0, 0, 0])
+
+        feed = OnchainPriceFeed(w3, POOL, interval_seconds=60)
+        timestamps, prices = feed.fetch_twap_series(2)
+
+        self.assertEqual(timestamps, [1_700_000_000 - 120, 1_700_000_000 - 60])
+        self.assertEqual(len(prices), 2)
+
+
+@unittest.skipUnless(
+    os.getenv("ANVIL_RPC_URL") and os.getenv("ANVIL_POOL_ADDRESS"),
+    "Set ANVIL_RPC_URL and ANVIL_POOL_ADDRESS (a lib/v3-core pool with swaps) to run"
+)
+class TestOnchainPricesAnvil(unittest.TestCase):
+
+    def test_candles_and_twap_from_pool(self):
+        from web3 import Web3
+
+        w3 = Web3(Web3.HTTPProvider(os.environ["ANVIL_RPC_URL"]))
+        feed = OnchainPriceFeed(w3, os.environ["ANVIL_POOL_ADDRESS"], interval_seconds=60)
+
+        candles = feed.fetch_candles(0, w3.eth.block_number)
+        self.assertGreater(len(candles), 0)
+        self.assertTrue((candles["low"] <= candles["high"]).all())
+
+        twap = feed.fetch_twap(1)
+        self.assertEqual(len(twap), 1)
+        self.assertGreater(twap[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import pstats
+import signal
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.keepers.profiling import CycleProfiler, categorise
+
+
+def pandas_cycle(n=20000):
+    df = pd.DataFrame({"price": range(n)})
+    return float(df["price"].rolling(24).mean().sum())
+
+
+class TestCycleProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiler = CycleProfiler(self.tmp.name, cycles=2, top=5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_disarmed_is_passthrough(self):
+        with patch("scripts.keepers.profiling.cProfile.Profile") as profile:
+            self.assertEqual(self.profiler.run("1", lambda x: x + 1, 41), 42)
+        profile.assert_not_called()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_captures_next_n_cycles(self):
+        self.profiler.request()
+        for cycle in range(3):
+            self.profiler.run(f"{cycle:06d}", pandas_cycle)
+
+        self.assertEqual(self.profiler.remaining, 0)
+        self.assertEqual(len(self.profiler.captured), 2)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        prefix = os.path.join(self.tmp.name, "cycle-000000")
+        stats = pstats.Stats(f"{prefix}.prof")
+        self.assertGreater(categorise(stats)["pandas"], 0)
+        self.assertTrue(tracemalloc.Snapshot.load(f"{prefix}.tracemalloc").traces)
+        with open(f"{prefix}.txt") as f:
+            summary = f.read()
+        self.assertIn("Time by library", summary)
+        self.assertIn("Top allocations", summary)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "cycle-000002.prof")))
+
+    def test_failed_cycle_is_still_captured(self):
+        self.profiler.request(1)
+
+        def failing_cycle():
+            raise RuntimeError("rpc down")
+
+        with self.assertRaises(RuntimeError):
+            self.profiler.run("err", failing_cycle)
+        self.assertEqual(self.profiler.remaining, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "cycle-err.txt")))
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR1"), "SIGUSR1 not available")
+    def test_signal_arms_profiler(self):
+        previous = signal.signal(signal.SIGUSR1, self.profiler.handle_signal)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        self.assertEqual(self.profiler.remaining, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
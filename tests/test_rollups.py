@@ -0,0 +1,216 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.keepers.rollups import (
+    RollupWriter,
+    aggregate_prices,
+    aggregate_vaults,
+    backfill,
+    bucket_start,
+    to_rows,
+)
+from scripts.keepers.telemetry import TelemetrySpool
+from scripts.replay import FakeSupabase
+
+START = datetime(2024, 1, 3, 22, 30)  # A Wednesday
+
+
+def price_records(n=100, step_minutes=20, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"timestamp": (START + timedelta(minutes=step_minutes * i)).isoformat(),
+         "symbol": "ETH", "price_usd": 2000 + rng.uniform(-50, 50)}
+        for i in range(n)
+    ]
+
+
+class TestRollupAggregation(unittest.TestCase):
+    def test_bucket_boundaries(self):
+        self.assertEqual(bucket_start(START, "hour"), datetime(2024, 1, 3, 22))
+        self.assertEqual(bucket_start(START, "day"), datetime(2024, 1, 3))
+        self.assertEqual(bucket_start(START, "week"), datetime(2024, 1, 1))
+        # Supabase returns offset-aware timestamps; buckets are in UTC
+        self.assertEqual(bucket_start("2024-01-03T23:30:00-02:00", "day"), datetime(2024, 1, 4))
+
+    def test_price_ohlc(self):
+        records = price_records()
+        rollups = aggregate_prices(records)
+
+        day = rollups[("ETH", "day", datetime(2024, 1, 4))]
+        in_day = [r for r in records if r["timestamp"].startswith("2024-01-04")]
+        self.assertEqual(day["open"], in_day[0]["price_usd"])
+        self.assertEqual(day["close"], in_day[-1]["price_usd"])
+        self.assertEqual(day["high"], max(r["price_usd"] for r in in_day))
+        self.assertEqual(day["low"], min(r["price_usd"] for r in in_day))
+        self.assertEqual(day["samples"], len(in_day))
+        self.assertEqual(sum(1 for key in rollups if key[1] == "week"), 1)
+
+    def test_incremental_merge_matches_full_aggregate(self):
+        """Merging shuffled batches gives the same rollups as one pass over all records."""
+        records = price_records()
+        full = aggregate_prices(records)
+
+        shuffled = records[:]
+        random.Random(1).shuffle(shuffled)
+        incremental = {}
+        for start in range(0, len(shuffled), 7):
+            aggregate_prices(shuffled[start:start + 7], rollups=incremental)
+        self.assertEqual(incremental, full)
+
+    def test_vault_rollups(self):
+        apy = [
+            {"timestamp": "2024-01-03T10:00:00", "vault_address": "0xABC", "apy": 10.0, "tvl": 100.0},
+            {"timestamp": "2024-01-03T14:00:00", "vault_address": "0xabc", "apy": 20.0, "tvl": 150.0},
+        ]
+        rebalances = [
+            {"timestamp": "2024-01-03T12:00:00", "vault_address": "0xabc", "gas_used": 300000, "cost_eth": 0.01},
+            {"timestamp": "2024-01-03T16:00:00", "vault_address": "0xabc", "gas_used": None, "cost_eth": None},
+        ]
+        day = aggregate_vaults(apy, rebalances)[("0xabc", "day", datetime(2024, 1, 3))]
+
+        self.assertEqual(day["apy_sum"] / day["apy_count"], 15.0)
+        self.assertEqual((day["tvl_last"], day["tvl_time"]), (150.0, datetime(2024, 1, 3, 14)))
+        self.assertEqual((day["rebalance_count"], day["gas_used"], day["cost_eth"]), (2, 300000, 0.01))
+
+    def test_rows_are_json_ready(self):
+        row = to_rows(aggregate_prices(price_records(1), buckets=("hour",)))[0]
+        self.assertEqual(row["bucket_start"], "2024-01-03T22:00:00")
+        self.assertEqual(row["open_time"], "2024-01-03T22:30:00")
+
+
+class TestRollupWriter(unittest.TestCase):
+    def test_one_merge_rpc_per_table(self):
+        client = MagicMock()
+        writer = RollupWriter(client)
+
+        writer("price_history", price_records(10))
+        writer("bot_heartbeats", [{"bot_id": "keeper"}])
+        writer("apy_history", [])
+
+        client.rpc.assert_called_once()
+        function, params = client.rpc.call_args[0]
+        self.assertEqual(function, "merge_price_rollups")
+        self.assertEqual(len(params["rows"]), len(aggregate_prices(price_records(10))))
+
+    def test_spool_only_rolls_up_new_records(self):
+        """Records the keeper re-spools (already stored) are not counted twice."""
+        client = FakeSupabase()
+        merged = []
+        with tempfile.TemporaryDirectory() as tmp:
+            spool = TelemetrySpool(
+                os.path.join(tmp, "spool.db"), client,
+                on_flushed=lambda table, records: merged.append((table, len(records)))
+            )
+            spool.write_many("price_history", price_records(30))
+            spool.flush()
+            spool.write_many("price_history", price_records(31))
+            spool.flush()
+            spool.close()
+
+        self.assertEqual(merged, [("price_history", 30), ("price_history", 1)])
+
+    def test_callback_failure_does_not_requeue(self):
+        client = FakeSupabase()
+        with tempfile.TemporaryDirectory() as tmp:
+            spool = TelemetrySpool(os.path.join(tmp, "spool.db"), client, on_flushed=MagicMock(side_effect=RuntimeError))
+            spool.write_many("price_history", price_records(5))
+            self.assertEqual(spool.flush(), 5)
+            self.assertEqual(spool.pending(), 0)
+            spool.close()
+
+    def test_permission_denied_disables_writer(self):
+        class DeniedError(Exception):
+            code = "42501"
+
+        client = MagicMock()
+        client.rpc.return_value.execute.side_effect = DeniedError(
+            "permission denied for function merge_price_rollups"
+        )
+        writer = RollupWriter(client)
+
+        with self.assertLogs("scripts.keepers.rollups", level="ERROR") as logs:
+            writer("price_history", price_records(5))
+        self.assertIn("SUPABASE_SERVICE_KEY", logs.output[0])
+        self.assertFalse(writer.enabled)
+
+        writer("price_history", price_records(5))
+        client.rpc.assert_called_once()
+
+    def test_transient_merge_failure_keeps_writer(self):
+        client = MagicMock()
+        client.rpc.return_value.execute.side_effect = ConnectionError("timed out")
+        writer = RollupWriter(client)
+
+        with self.assertRaises(ConnectionError):
+            writer("price_history", price_records(5))
+        self.assertTrue(writer.enabled)
+
+
+class _PagedTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def delete(self):
+        self.db.deleted.append(self.name)
+        return self
+
+    def in_(self, column, values):
+        return self
+
+    def upsert(self, rows, on_conflict=""):
+        self.db.written.setdefault(self.name, []).extend(rows)
+        return self
+
+    def execute(self):
+        if self.bounds is not None:
+            start, end = self.bounds
+            self.data = self.db.raw.get(self.name, [])[start:end + 1]
+        return self
+
+
+class _PagedClient:
+    def __init__(self, raw):
+        self.raw = raw
+        self.deleted = []
+        self.written = {}
+
+    def table(self, name):
+        return _PagedTable(self, name)
+
+
+class TestBackfill(unittest.TestCase):
+    def test_rebuilds_from_pages(self):
+        prices = price_records(250)
+        apy = [{"timestamp": r["timestamp"], "vault_address": "0xabc", "apy": 18.0, "tvl": 1.0} for r in prices[:40]]
+        client = _PagedClient({"price_history": prices, "apy_history": apy, "rebalance_events": []})
+
+        written = backfill(client, page_size=64)
+
+        self.assertEqual(client.deleted, ["price_rollups", "vault_rollups"])
+        self.assertEqual(written["price_rollups"], len(aggregate_prices(prices)))
+        self.assertEqual(written["vault_rollups"], len(aggregate_vaults(apy)))
+        self.assertEqual(len(client.written["price_rollups"]), written["price_rollups"])
+
+
+if __name__ == "__main__":
+    unittest.main()
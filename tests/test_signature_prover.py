@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+
+from scripts.keepers.signature_prover import (
+    RebalanceSigner,
+    SigningService,
+    encode_rebalance_payload,
+    generate_signature_proof,
+)
+
+# Anvil account #0, also used as keeperPk in contracts/test
+KEEPER_PK = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def reference_signature(tick_lower, tick_upper, block_number):
+    """Original solidity_keccak + encode_defunct signing path."""
+    message_hash = Web3.solidity_keccak(
+        ['int24', 'int24', 'uint256'],
+        [tick_lower, tick_upper, block_number]
+    )
+    message = encode_defunct(hexstr=message_hash.hex())
+    return bytes(Account.from_key(KEEPER_PK).sign_message(message).signature)
+
+
+class TestRebalanceSigner(unittest.TestCase):
+
+    def setUp(self):
+        self.signer = RebalanceSigner(KEEPER_PK)
+
+    def test_payload_matches_encode_packed(self):
+        payload = encode_rebalance_payload(-1000, 1000, 12345)
+        self.assertEqual(len(payload), 38)
+        self.assertEqual(
+            self.signer.message_hash(-1000, 1000, 12345),
+            bytes(Web3.solidity_keccak(['int24', 'int24', 'uint256'], [-1000, 1000, 12345]))
+        )
+
+    def test_signature_matches_reference(self):
+        for request in [(-1000, 1000, 12345), (-887220, 887220, 2 ** 64), (0, 60, 1)]:
+            self.assertEqual(self.signer.sign(*request), reference_signature(*request))
+
+    def test_foundry_vector(self):
+        # Same vector is checked on-chain in contracts/test/ZkVerifier.t.sol
+        signature = self.signer.sign(-1000, 1000, 12345)
+        self.assertEqual(
+            signature.hex(),
+            "5cba3d57d2bccb0d55ab2e1e4b3356ba355a66cbf1371e8d271f7ebf6ec0636d"
+            "6b790fff0aab32ae638e038fc3d4d5b46dec2d290fe85b9a0d10bd55b4c2a6d01b"
+        )
+        self.assertEqual(self.signer.address, "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266")
+
+    def test_out_of_range_tick_rejected(self):
+        with self.assertRaises(ValueError):
+            self.signer.sign(2 ** 23, 0, 1)
+
+    def test_generate_signature_proof_compatible(self):
+        self.assertEqual(
+            generate_signature_proof(-60, 60, 99, KEEPER_PK),
+            reference_signature(-60, 60, 99)
+        )
+
+    def test_batch_in_worker_process(self):
+        requests = [(-60 * i, 60 * i, 100 + i) for i in range(1, 5)]
+        with SigningService(KEEPER_PK, use_process=True) as service:
+            signatures = service.submit(requests).result(timeout=60)
+        self.assertEqual(signatures, [reference_signature(*r) for r in requests])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import tempfile
+import time
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.keepers.telemetry import MAX_ATTEMPTS, TelemetrySpool
+
+
+class RejectingClient:
+    """Supabase stand-in that rejects any batch containing a record with a null price."""
+
+    class Error(Exception):
+        def __init__(self, code):
+            super().__init__(f"{code}: null value in column \"price_usd\"")
+            self.code = code
+
+    def __init__(self, code="23502"):
+        self.code = code
+        self.stored = []
+        self.requests = 0
+
+    def table(self, name):
+        return self
+
+    def upsert(self, records, **kwargs):
+        self.requests += 1
+        if any(record["price_usd"] is None for record in records):
+            raise self.Error(self.code)
+        self.stored.extend(records)
+        return MagicMock(data=records)
+
+    def execute(self):
+        return self
+
+
+class TestTelemetrySpool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "spool.db")
+        self.client = MagicMock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_write_is_local_until_flush(self):
+        spool = TelemetrySpool(self.path, self.client)
+        spool.write("apy_history", {"timestamp": "t1", "vault_address": "0xv", "apy": 18.0})
+
+        self.client.table.assert_not_called()
+        self.assertEqual(spool.pending(), 1)
+
+        self.assertEqual(spool.flush(), 1)
+        self.client.table.assert_called_once_with("apy_history")
+        args, kwargs = self.client.table.return_value.upsert.call_args
+        self.assertEqual(args[0], [{"timestamp": "t1", "vault_address": "0xv", "apy": 18.0}])
+        self.assertEqual(kwargs["on_conflict"], "timestamp,vault_address")
+        self.assertTrue(kwargs["ignore_duplicates"])
+        self.assertEqual(spool.pending(), 0)
+        spool.close()
+
+    def test_bulk_batches_and_dedupes_keys(self):
+        spool = TelemetrySpool(self.path, self.client, batch_size=2)
+        spool.write_many("price_history", [
+            {"timestamp": "d1", "symbol": "ETH", "price_usd": 1.0},
+            {"timestamp": "d1", "symbol": "ETH", "price_usd": 2.0},
+            {"timestamp": "d2", "symbol": "ETH", "price_usd": 3.0},
+        ])
+
+        self.assertEqual(spool.flush(), 3)
+        upsert = self.client.table.return_value.upsert
+        self.assertEqual(upsert.call_count, 2)
+        self.assertEqual(upsert.call_args_list[0][0][0], [{"timestamp": "d1", "symbol": "ETH", "price_usd": 2.0}])
+        spool.close()
+
+    def test_failed_flush_keeps_records(self):
+        self.client.table.return_value.upsert.return_value.execute.side_effect = Exception("503")
+        spool = TelemetrySpool(self.path, self.client)
+        spool.write("rebalance_events", {"tx_hash": "0xabc", "tick_lower": -60})
+
+        self.assertEqual(spool.flush(), 0)
+        self.assertEqual(spool.pending(), 1)
+        spool._conn.close()
+
+        # Records survive a restart and ship once Supabase recovers
+        client = MagicMock()
+        spool = TelemetrySpool(self.path, client)
+        spool._conn.execute("UPDATE spool SET next_attempt = 0")
+        self.assertEqual(spool.flush(), 1)
+        args, kwargs = client.table.return_value.upsert.call_args
+        self.assertEqual(args[0], [{"tx_hash": "0xabc", "tick_lower": -60}])
+        self.assertEqual(kwargs["on_conflict"], "tx_hash")
+        spool.close()
+
+    def test_heartbeat_overwrites(self):
+        spool = TelemetrySpool(self.path, self.client)
+        spool.write("bot_heartbeats", {"bot_id": "keeper", "status": "active"})
+        spool.write("bot_heartbeats", {"bot_id": "keeper", "status": "stopped"})
+        spool.close()
+
+        args, kwargs = self.client.table.return_value.upsert.call_args
+        self.assertEqual(args[0], [{"bot_id": "keeper", "status": "stopped"}])
+        self.assertFalse(kwargs["ignore_duplicates"])
+
+    def test_deferred_heartbeat_never_overwrites_newer(self):
+        upsert = self.client.table.return_value.upsert
+        upsert.return_value.execute.side_effect = Exception("503")
+        spool = TelemetrySpool(self.path, self.client)
+        spool.write("bot_heartbeats", {"bot_id": "keeper", "status": "active"})
+        self.assertEqual(spool.flush(), 0)
+
+        # The old row is backing off; a newer heartbeat arrives and Supabase recovers
+        upsert.return_value.execute.side_effect = None
+        spool.write("bot_heartbeats", {"bot_id": "keeper", "status": "stopped"})
+        self.assertEqual(spool.flush(), 1)
+        self.assertEqual(upsert.call_args[0][0], [{"bot_id": "keeper", "status": "stopped"}])
+
+        # Once its backoff expires the stale row is not shipped after the newer one
+        spool._conn.execute("UPDATE spool SET next_attempt = 0")
+        self.assertEqual(spool.flush(), 0)
+        self.assertEqual(spool.pending(), 0)
+        spool.close()
+
+    def test_rejected_record_is_quarantined_and_batch_ships(self):
+        client = RejectingClient()
+        spool = TelemetrySpool(self.path, client)
+        records = [{"timestamp": f"d{i}", "symbol": "ETH", "price_usd": float(i)} for i in range(16)]
+        records[11]["price_usd"] = None
+        spool.write_many("price_history", records)
+
+        self.assertEqual(spool.flush(), 15)
+        self.assertEqual(len(client.stored), 15)
+        self.assertEqual(spool.pending(), 0)
+        self.assertEqual(spool.quarantined(), 1)
+        # Bisection isolates the record in a logarithmic number of requests
+        self.assertLessEqual(client.requests, 1 + 2 * 4)
+
+        self.assertEqual(spool.requeue_quarantined(), 1)
+        self.assertEqual(spool.pending(), 1)
+        spool._conn.close()
+
+    def test_outage_defers_without_quarantine(self):
+        client = RejectingClient(code=None)
+        spool = TelemetrySpool(self.path, client)
+        spool.write_many("price_history", [
+            {"timestamp": "d1", "symbol": "ETH", "price_usd": None},
+            {"timestamp": "d2", "symbol": "ETH", "price_usd": 2.0},
+        ])
+
+        self.assertEqual(spool.flush(), 0)
+        self.assertEqual(client.requests, 1)
+        self.assertEqual((spool.pending(), spool.quarantined()), (2, 0))
+
+        # A record still failing after MAX_ATTEMPTS is isolated anyway
+        spool._conn.execute("UPDATE spool SET next_attempt = 0, attempts = ?", (MAX_ATTEMPTS,))
+        self.assertEqual(spool.flush(), 1)
+        self.assertEqual((spool.pending(), spool.quarantined()), (0, 1))
+        spool._conn.close()
+
+    def test_unknown_table_rejected(self):
+        spool = TelemetrySpool(self.path, self.client)
+        with self.assertRaises(ValueError):
+            spool.write("not_a_table", {})
+        spool.close()
+
+    def test_background_flusher(self):
+        spool = TelemetrySpool(self.path, self.client, flush_interval=0.01).start()
+        spool.write("apy_history", {"timestamp": "t1", "vault_address": "0xv"})
+        for _ in range(200):
+            if spool.pending() == 0:
+                break
+            time.sleep(0.01)
+        self.assertEqual(spool.pending(), 0)
+        spool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()